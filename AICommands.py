@@ -0,0 +1,43 @@
+from TextTools import word_count as count_words, character_count as count_characters, extract_keywords
+
+# Built-in AI assistant commands, loaded by the command registry on first use.
+# Each one gets a snapshot of the document and the message that triggered it.
+
+
+def word_count(text, message):
+    return f"The current word count is {count_words(text)}."
+
+
+def character_count(text, message):
+    return f"The current character count is {count_characters(text)}."
+
+
+def uppercase(text, message):
+    return "Text converted to uppercase.", text.upper()
+
+
+def lowercase(text, message):
+    return "Text converted to lowercase.", text.lower()
+
+
+def clear(text, message):
+    return "Text cleared.", ""
+
+
+def sentiment(text, message):
+    from textblob import TextBlob  # Slow to import, so only when first needed
+    polarity = TextBlob(text).sentiment.polarity
+    if polarity > 0.1:
+        mood = "positive"
+    elif polarity < -0.1:
+        mood = "negative"
+    else:
+        mood = "neutral"
+    return f"The text sounds {mood} (polarity {polarity:.2f})."
+
+
+def keywords(text, message):
+    top = extract_keywords(text)
+    if not top:
+        return "There are no keywords in an empty document."
+    return "Top keywords: " + ", ".join(top)
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pygments.lexers import get_lexer_for_filename, TextLexer
+from pygments.util import ClassNotFound
+from Exporter import get_formatter
+from TextTools import decode_text, newline_style, word_count, character_count, extract_keywords, replace_text, change_case, make_list
+
+
+# Headless mode: python main.py --batch [options] FILE... applies the editor's document
+# transforms to many files in a process pool and prints one JSON result per file.
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py --batch", description="Apply NotPad transforms to files without opening a window.")
+    parser.add_argument("--batch", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("files", nargs="*", help="Files to process; '-' or none reads file names from stdin")
+    parser.add_argument("--replace", nargs=2, action="append", default=[], metavar=("FIND", "REPLACE"),
+                        help="Replace all occurrences (may be given more than once)")
+    parser.add_argument("--regex", action="store_true", help="Treat FIND as a regular expression")
+    parser.add_argument("--ignore-case", action="store_true", help="Match FIND in any case")
+    parser.add_argument("--case", choices=["upper", "lower", "title"], help="Convert the text's case")
+    parser.add_argument("--list", choices=["numbered", "bulleted"], help="Turn every line into a list item")
+    parser.add_argument("--keywords", type=int, default=0, metavar="N", help="Report the N most common words")
+    parser.add_argument("--count", action="store_true", help="Report word and character counts")
+    parser.add_argument("--html", action="store_true", help="Export a syntax-highlighted HTML copy")
+    parser.add_argument("--output-dir", help="Write results here instead of next to the input")
+    parser.add_argument("--in-place", action="store_true", help="Overwrite the input files with the transformed text")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of worker processes")
+    return parser.parse_args(argv)
+
+
+def output_path(path, options, suffix=""):
+    """
+    Return where to write the result for an input file. Under --output-dir the file keeps
+    its directories relative to the working directory (or from the root, for files outside
+    it), so files with the same name in different directories do not overwrite each other.
+    """
+    if options.in_place and not suffix:
+        return path
+    if not options.output_dir:
+        return path + suffix
+    absolute = os.path.abspath(path)
+    try:
+        relative = os.path.relpath(absolute)
+    except ValueError:  # On another drive
+        relative = os.pardir
+    if relative.split(os.sep)[0] == os.pardir:
+        drive, rest = os.path.splitdrive(absolute)
+        relative = os.path.join(drive.strip(":\\/"), rest.lstrip("\\/"))
+    return os.path.join(options.output_dir, relative + suffix)
+
+
+def output_paths(path, options):
+    """
+    Return every file the result for an input file may be written to.
+    """
+    targets = []
+    if options.in_place or options.output_dir:
+        targets.append(output_path(path, options))
+    if options.html:
+        targets.append(output_path(path, options, ".html"))
+    return targets
+
+
+def write_html(code, path, target):
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    try:
+        lexer = get_lexer_for_filename(path, code)
+    except ClassNotFound:
+        lexer = TextLexer()
+    with open(target, "w", encoding="utf-8") as file:
+        get_formatter("html").format(lexer.get_tokens(code), file)
+
+
+def process_file(path, options):
+    """
+    Apply the requested transforms to one file (runs in a worker process).
+    """
+    result = {"path": path}
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        original, encoding = decode_text(data)
+        newline = newline_style(data)  # decode_text turns CRLF into newlines, so write it back
+        text = original
+        for find, replacement in options.replace:
+            text, replaced = replace_text(text, find, replacement, not options.ignore_case, options.regex)
+            result["replacements"] = result.get("replacements", 0) + replaced
+        if options.case:
+            text = change_case(text, options.case)
+        if options.list:
+            text = make_list(text, options.list)
+        if options.count:
+            result["words"] = word_count(text)
+            result["characters"] = character_count(text)
+        if options.keywords:
+            result["keywords"] = extract_keywords(text, options.keywords)
+        if text != original and (options.in_place or options.output_dir):
+            target = output_path(path, options)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with open(target, "w", encoding=encoding, newline=newline) as file:
+                file.write(text)
+            result["output"] = target
+        if options.html:
+            target = output_path(path, options, ".html")
+            write_html(text, path, target)
+            result["html"] = target
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def input_files(options):
+    """
+    Yield the files to process, reading names from stdin lazily when asked to.
+    """
+    if not options.files or options.files == ["-"]:
+        for line in sys.stdin:
+            if line.strip():
+                yield line.strip()
+    else:
+        yield from options.files
+
+
+def run(options, out=sys.stdout):
+    """
+    Process all files with a bounded number of jobs in flight, writing each result as soon
+    as it is ready. Returns the number of files that failed.
+    """
+    if options.output_dir:
+        os.makedirs(options.output_dir, exist_ok=True)
+    failures = 0
+    claimed = {}  # Output file -> input file it is written for
+    max_pending = options.jobs * 4  # Keeps workers busy without queueing every file at once
+    with ProcessPoolExecutor(max_workers=options.jobs) as executor:
+        pending = set()
+        paths = input_files(options)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                    continue
+                # Two inputs with the same output (e.g. one file listed twice) would race to write it
+                targets = [os.path.normcase(os.path.abspath(target)) for target in output_paths(path, options)]
+                clash = next((claimed[target] for target in targets if target in claimed), None)
+                if clash is not None:
+                    failures += 1
+                    out.write(json.dumps({"path": path, "error": f"Output would overwrite the result for {clash}"}) + "\n")
+                    continue
+                claimed.update(dict.fromkeys(targets, path))
+                pending.add(executor.submit(process_file, path, options))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                failures += "error" in result
+                out.write(json.dumps(result) + "\n")
+            out.flush()
+    return failures
+
+
+def main(argv=None):
+    options = parse_args(sys.argv[1:] if argv is None else argv)
+    return 1 if run(options) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import json
+import os
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+from LRUCache import LRUCache
+from TextTools import preprocess
+
+CHAT_DIR = os.path.join(os.path.expanduser("~"), ".notpad", "chat")
+MAX_LOGS = 50  # Session logs kept in CHAT_DIR
+MAX_LOG_BYTES = 64 * 1024 * 1024  # Total size of the logs kept
+
+
+def prune_logs(directory=CHAT_DIR, keep=MAX_LOGS, max_bytes=MAX_LOG_BYTES):
+    """
+    Delete the oldest session logs beyond the newest keep, or once together they pass max_bytes.
+    """
+    try:
+        # Logs are named after the time they were started, so newest sorts first in reverse
+        names = sorted((name for name in os.listdir(directory) if name.endswith(".jsonl")), reverse=True)
+    except OSError:
+        return
+    total = 0
+    for count, name in enumerate(names):
+        path = os.path.join(directory, name)
+        try:
+            total += os.path.getsize(path)
+            if count >= keep or total > max_bytes:
+                os.remove(path)
+        except OSError as e:
+            print(f"Error removing old chat log: {e}")
+
+
+# Transcript of an AI assistant session. Every turn is appended to a JSON-lines log on
+# disk; only the most recent turns stay in memory and older ones are read back by offset
+# when they are scrolled to. An inverted index maps words to turns for searching.
+# Starting a session deletes the oldest logs in CHAT_DIR once there are too many.
+class ChatHistory:
+    def __init__(self, path=None, max_in_memory=200):
+        if path is None:
+            os.makedirs(CHAT_DIR, exist_ok=True)
+            path = os.path.join(CHAT_DIR, datetime.now().strftime("%Y%m%d-%H%M%S-%f") + ".jsonl")
+            prune_logs(keep=MAX_LOGS - 1)  # Leave room for this session's log
+        self.path = path
+        self._file = open(path, "a+b")
+        self._offsets = array("Q")  # Where every turn starts in the log
+        self._recent = deque(maxlen=max_in_memory)
+        self._index = {}  # Word -> ascending list of turn numbers
+        self._spilled = LRUCache(256)  # Turns read back from the log
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def add(self, role, message):
+        """
+        Record a turn and return its number.
+        """
+        turn = (role, message, time.time())
+        self._file.seek(0, os.SEEK_END)
+        self._offsets.append(self._file.tell())
+        self._file.write(json.dumps(turn).encode("utf-8") + b"\n")
+        self._file.flush()
+        self._recent.append(turn)
+        number = len(self._offsets) - 1
+        for word in set(preprocess(message)):
+            self._index.setdefault(word, []).append(number)
+        return number
+
+    def get(self, number):
+        """
+        Return turn number as (role, message, timestamp).
+        """
+        first_recent = len(self._offsets) - len(self._recent)
+        if number >= first_recent:
+            return self._recent[number - first_recent]
+        turn = self._spilled.get(number)
+        if turn is None:
+            self._file.seek(self._offsets[number])
+            turn = tuple(json.loads(self._file.readline()))
+            self._spilled.put(number, turn)
+        return turn
+
+    def search(self, query):
+        """
+        Return the numbers of the turns containing every word of the query, in order.
+        """
+        words = preprocess(query)
+        if not words:
+            return []
+        postings = sorted((self._index.get(word, []) for word in set(words)), key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            found.intersection_update(posting)
+        return sorted(found)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,146 @@
+from tkinter import *
+from tkinter import font
+
+
+# Chat transcript view that only renders the turns that fit in the window, however long
+# the history gets. It follows new turns while scrolled to the bottom. The wheel scrolls
+# line by line through what is rendered, so a turn taller than the window can be read,
+# and moves on to the next or previous turn at either end.
+class ChatView(Frame):
+    def __init__(self, master, history):
+        super().__init__(master)
+        self.history = history
+        self.top = 0  # First rendered turn
+        self.offset = 0  # Display lines of the first turn scrolled above the window
+        self.last = 0  # One past the last rendered turn
+        self.following = True
+        self.highlight = None  # (turn, query) to mark after rendering
+        self.scroll_bar = Scrollbar(self, command=self._on_scroll)
+        self.scroll_bar.pack(side=RIGHT, fill=Y)
+        self.view = Text(self, state=DISABLED, wrap=WORD)
+        self.view.pack(side=LEFT, fill=BOTH, expand=True)
+        self.view.tag_config("role", font=("Arial", 10, "bold"))
+        self.view.tag_config("match", background="yellow")
+        self.view.bind("<Configure>", lambda event: self.render())
+        self.view.bind("<MouseWheel>", lambda event: self._scroll_turns(-event.delta // 120))
+        self.view.bind("<Button-4>", lambda event: self._scroll_turns(-1))
+        self.view.bind("<Button-5>", lambda event: self._scroll_turns(1))
+        self._line_height = font.Font(font=self.view.cget("font")).metrics("linespace")
+
+    def _visible_turns(self):
+        # Every turn takes at least one line, so this many always fill the window
+        return max(1, self.view.winfo_height() // self._line_height)
+
+    def render(self):
+        """
+        Redraw the turns in the window.
+        """
+        total = len(self.history)
+        count = self._visible_turns()
+        if self.following:
+            self.top = max(0, total - count)
+        last = self.last = min(total, self.top + count)
+        self.view.config(state=NORMAL)
+        self.view.delete("1.0", END)
+        for mark in self.view.mark_names():
+            if mark.startswith("turn"):
+                self.view.mark_unset(mark)
+        for number in range(self.top, last):
+            role, message, _ = self.history.get(number)
+            self.view.mark_set(f"turn{number}", "end-1c")
+            self.view.mark_gravity(f"turn{number}", LEFT)
+            self.view.insert(END, f"{role}: ", "role")
+            self.view.insert(END, f"{message}\n\n")
+        if self.highlight and self.top <= self.highlight[0] < last:
+            self._mark_matches(*self.highlight)
+        self.view.config(state=DISABLED)
+        if self.following:
+            self.view.see(END)
+            self._remember_offset()
+        elif self.top < last:
+            self.view.yview(f"turn{self.top} + {self.offset} display lines")
+        if total:
+            self.scroll_bar.set(self.top / total, last / total)
+        else:
+            self.scroll_bar.set(0, 1)
+
+    def _mark_matches(self, number, query):
+        start = f"turn{number}"
+        end = f"turn{number + 1}" if f"turn{number + 1}" in self.view.mark_names() else END
+        for word in query.split():
+            index = self.view.search(word, start, stopindex=end, nocase=True)
+            while index:
+                word_end = f"{index}+{len(word)}c"
+                self.view.tag_add("match", index, word_end)
+                index = self.view.search(word, word_end, stopindex=end, nocase=True)
+
+    def add(self, role, message):
+        """
+        Record a turn in the history and show it if the view is at the bottom.
+        """
+        number = self.history.add(role, message)
+        if self.following:
+            self.render()
+        else:
+            total = len(self.history)
+            self.scroll_bar.set(self.top / total, min(total, self.top + self._visible_turns()) / total)
+        return number
+
+    def _remember_offset(self):
+        lines = self.view.count(f"turn{self.top}", "@0,0", "displaylines") if self.top < self.last else None
+        self.offset = lines[0] if lines else 0
+
+    def _turn_at_top(self):
+        """
+        Return the turn shown on the first line of the window.
+        """
+        number = self.top
+        while number + 1 < self.last and self.view.compare(f"turn{number + 1}", "<=", "@0,0"):
+            number += 1
+        return number
+
+    def _scroll_turns(self, delta):
+        first, last = self.view.yview()
+        if delta > 0 and last < 1.0 or delta < 0 and first > 0.0:
+            # Scroll through the rendered text first
+            self.view.yview_scroll(delta * 3, "units")
+            self._remember_offset()
+            self.following = self.last >= len(self.history) and self.view.yview()[1] >= 1.0
+            return "break"
+        if delta > 0:
+            self.scroll_to(self._turn_at_top() + delta)
+        elif self.top > 0:
+            self.scroll_to(self.top + delta)
+            if not self.following and self.top + 1 < self.last:
+                # Coming from below, so show the end of the turn rather than its start
+                self.view.see(f"turn{self.top + 1}")
+                self._remember_offset()
+        return "break"
+
+    def scroll_to(self, number):
+        """
+        Make the given turn the first visible one; scrolling past the end follows new turns.
+        """
+        total = len(self.history)
+        count = self._visible_turns()
+        self.top = max(0, min(number, total - 1))
+        self.offset = 0
+        self.following = self.top >= total - count
+        self.render()
+
+    def show_turn(self, number, query=None):
+        """
+        Scroll to a turn, marking the query's words in it.
+        """
+        self.highlight = (number, query) if query else None
+        self.scroll_to(number)
+        if self.following and self.highlight:
+            self.view.see(f"turn{number}")
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.history)))
+        elif unit == "pages":
+            self._scroll_turns(int(amount) * self._visible_turns())
+        else:
+            self._scroll_turns(int(amount))
@@ -0,0 +1,97 @@
+import importlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# A chat command; its handler is either given directly or loaded from "module:function"
+# the first time the command is used, so unused plugins are never imported
+class Command:
+    def __init__(self, name, patterns, help_text, handler=None, plugin=None):
+        self.name = name
+        self.patterns = patterns
+        self.help_text = help_text
+        self.plugin = plugin
+        self._handler = handler
+        self.calls = 0
+        self.total_time = 0.0
+
+    def handler(self):
+        if self._handler is None:
+            module_name, function_name = self.plugin.split(":")
+            self._handler = getattr(importlib.import_module(module_name), function_name)
+        return self._handler
+
+    def average_ms(self):
+        return self.total_time / self.calls * 1000 if self.calls else None
+
+
+# Dispatches chat messages to commands through a single regex alternation that is
+# compiled once (and again only after a command is registered), and runs the handlers
+# on a worker thread so the chat window never waits for them.
+# A handler takes (text, message), where text is a snapshot of the document, and returns
+# a reply or a (reply, new_text) pair; new_text is for the caller to apply on the UI thread.
+class CommandRegistry:
+    def __init__(self, fallback=None):
+        self.commands = {}
+        self.fallback = fallback  # Called with the message when no command matches
+        self._pattern = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)  # One at a time, in order
+
+    def register(self, name, patterns, help_text, handler=None, plugin=None):
+        """
+        Add a command matched by any of the given regex patterns (whole words, any case).
+        Patterns can be anchored with ^ to the start of the message.
+        """
+        self.commands[name] = Command(name, patterns, help_text, handler, plugin)
+        self._pattern = None
+
+    def _matcher(self):
+        if self._pattern is None:
+            groups = [f"(?P<{name}>{'|'.join(command.patterns)})" for name, command in self.commands.items()]
+            self._pattern = re.compile(r"\b(?:" + "|".join(groups) + r")\b", re.IGNORECASE)
+        return self._pattern
+
+    def match(self, message):
+        """
+        Return the command named first in the message, or None.
+        """
+        if not self.commands:
+            return None
+        found = self._matcher().search(message.strip())
+        return self.commands[found.lastgroup] if found else None
+
+    def run(self, message, text):
+        """
+        Run the matching command (or the fallback) and return (reply, new_text or None, command name).
+        """
+        command = self.match(message)
+        if command is None:
+            return (self.fallback(message) if self.fallback else ""), None, None
+        start = time.perf_counter()
+        result = command.handler()(text, message)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            command.calls += 1
+            command.total_time += elapsed
+        reply, new_text = result if isinstance(result, tuple) else (result, None)
+        return reply, new_text, command.name
+
+    def submit(self, message, text):
+        """
+        Run a message on the worker thread; returns a Future of run()'s result.
+        """
+        return self._executor.submit(self.run, message, text)
+
+    def help_text(self):
+        """
+        Describe every command, with its average run time once it has been used.
+        """
+        lines = []
+        for command in self.commands.values():
+            average = command.average_ms()
+            timing = f" ({average:.1f} ms)" if average is not None else ""
+            lines.append(f"- {command.help_text}{timing}")
+        return "\n".join(lines)
@@ -0,0 +1,68 @@
+import weakref
+import zlib
+
+CHUNK_CHARS = 1024 * 1024
+_live = weakref.WeakSet()  # Every CompactText, for memory accounting
+
+
+def memory_usage():
+    """
+    Return (stored bytes, uncompressed bytes) over all compact texts alive.
+    """
+    stored = 0
+    raw = 0
+    for item in list(_live):
+        item_stored, item_raw = item.memory()
+        stored += item_stored
+        raw += item_raw
+    return stored, raw
+
+
+# Text kept as zlib-compressed chunks and only decompressed when it is read.
+# Appends collect in a plain tail that is compressed once it fills a chunk, so chunks
+# may be shorter than CHUNK_CHARS.
+class CompactText:
+    def __init__(self, text="", level=1):
+        self.level = level  # Fast compression; logs and source text still shrink several times
+        self._chunks = []  # Compressed UTF-8 chunks
+        self._tail = ""
+        self.raw_bytes = 0
+        self.nbytes = 0
+        for start in range(0, len(text), CHUNK_CHARS):
+            self._compress(text[start:start + CHUNK_CHARS])
+        _live.add(self)
+
+    def append(self, text):
+        self._tail += text
+        if len(self._tail) >= CHUNK_CHARS:
+            cut = len(self._tail) - len(self._tail) % CHUNK_CHARS
+            for start in range(0, cut, CHUNK_CHARS):
+                self._compress(self._tail[start:start + CHUNK_CHARS])
+            self._tail = self._tail[cut:]
+
+    def _compress(self, piece):
+        data = piece.encode("utf-8")
+        chunk = zlib.compress(data, self.level)
+        self._chunks.append(chunk)
+        self.raw_bytes += len(data)
+        self.nbytes += len(chunk)
+
+    def chunks(self):
+        """
+        Yield the text chunk by chunk, decompressing one at a time.
+        """
+        for chunk in self._chunks:
+            yield zlib.decompress(chunk).decode("utf-8")
+        if self._tail:
+            yield self._tail
+
+    def text(self):
+        return "".join(self.chunks())
+
+    def memory(self):
+        """
+        Return (stored bytes, uncompressed bytes), the plain tail included.
+        """
+        tail = len(self._tail.encode("utf-8"))
+        return self.nbytes + tail, self.raw_bytes + tail
+
@@ -0,0 +1,81 @@
+from tkinter import *
+
+
+# Completion list shown under the cursor of a Text widget. While it is open, Up/Down pick
+# a completion, Tab/Return insert it and Escape closes the list; other keys go to the text.
+class CompletionPopup:
+    def __init__(self, text):
+        self.text = text
+        self.prefix = ""
+        self.window = None
+        self.listbox = None
+        # Our bindings run before the widget's own ones so they can swallow keys
+        tag = f"CompletionPopup{id(self)}"
+        text.bindtags((tag,) + text.bindtags())
+        text.bind_class(tag, "<Down>", lambda event: self._move(1))
+        text.bind_class(tag, "<Up>", lambda event: self._move(-1))
+        text.bind_class(tag, "<Tab>", lambda event: self._accept())
+        text.bind_class(tag, "<Return>", lambda event: self._accept())
+        text.bind_class(tag, "<Escape>", lambda event: self._close())
+        text.bind_class(tag, "<Button-1>", lambda event: self.hide())
+
+    def visible(self):
+        return self.window is not None and self.window.winfo_viewable()
+
+    def show(self, words, prefix):
+        """
+        List completions for the prefix just before the cursor, or hide the list if there are none.
+        """
+        bbox = self.text.bbox("insert")
+        if not words or not bbox:
+            self.hide()
+            return
+        self.prefix = prefix
+        if self.window is None:
+            self.window = Toplevel(self.text)
+            self.window.overrideredirect(True)
+            self.listbox = Listbox(self.window, height=len(words), exportselection=False)
+            self.listbox.pack(fill=BOTH, expand=True)
+            self.listbox.bind("<Double-Button-1>", lambda event: self._accept())
+        self.listbox.delete(0, END)
+        self.listbox.insert(END, *words)
+        self.listbox.config(height=len(words), width=max(len(word) for word in words) + 2)
+        self.listbox.selection_set(0)
+        x = self.text.winfo_rootx() + bbox[0]
+        y = self.text.winfo_rooty() + bbox[1] + bbox[3]
+        self.window.geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        if self.window is not None:
+            self.window.withdraw()
+
+    def _close(self):
+        if not self.visible():
+            return None
+        self.hide()
+        return "break"
+
+    def _move(self, step):
+        if not self.visible():
+            return None
+        selection = self.listbox.curselection()
+        index = (selection[0] if selection else 0) + step
+        index = max(0, min(index, self.listbox.size() - 1))
+        self.listbox.selection_clear(0, END)
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def _accept(self):
+        if not self.visible():
+            return None
+        selection = self.listbox.curselection()
+        if selection:
+            word = self.listbox.get(selection[0])
+            self.text.delete(f"insert-{len(self.prefix)}c", "insert")
+            self.text.insert("insert", word)
+        self.hide()
+        self.text.focus_set()
+        return "break"
@@ -0,0 +1,292 @@
+import locale
+import os
+import sys
+from bisect import bisect_left
+from collections import Counter
+from operator import lt
+from CompactStorage import CompactText
+
+MAX_MYERS_COST = 2000  # Edit distance after which Myers gives up and reports a plain replace
+BLOCK_SIZE = 64 * 1024  # Bytes compared at a time when looking for the changed byte range
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """
+    Patience step: match lines that occur exactly once on both sides and keep
+    the longest run of them that is in the same order on both sides.
+    """
+    a_window = a[alo:ahi]
+    b_window = b[blo:bhi]
+    a_counts = Counter(a_window)
+    b_counts = Counter(b_window)
+    b_index = dict(zip(b_window, range(blo, bhi)))
+    pairs = [(i, b_index[line]) for i, line in zip(range(alo, ahi), a_window)
+             if a_counts[line] == 1 and b_counts[line] == 1]
+    if not pairs:
+        return []
+    b_order = [j for _, j in pairs]
+    if all(map(lt, b_order, b_order[1:])):
+        return pairs
+    # Longest increasing subsequence of b indexes (patience sorting)
+    tails = []
+    tail_pos = []
+    back = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_pos.append(k)
+        else:
+            tails[pos] = j
+            tail_pos[pos] = k
+        back[k] = tail_pos[pos - 1] if pos else -1
+    result = []
+    k = tail_pos[-1]
+    while k != -1:
+        result.append(pairs[k])
+        k = back[k]
+    result.reverse()
+    return result
+
+
+def _myers(a, alo, ahi, b, blo, bhi, matches):
+    """
+    Classic O(ND) Myers diff for the ranges, appending matching (i, j, size) blocks.
+    Returns False if the edit distance exceeds MAX_MYERS_COST.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = min(n + m, MAX_MYERS_COST)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []  # trace[d][k + d] is the furthest x reached on diagonal k after d edits
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                _myers_backtrack(trace, d, k, x, alo, blo, matches)
+                return True
+        trace.append(v[offset - d:offset + d + 1])
+    return False
+
+
+def _myers_backtrack(trace, d, k, x, alo, blo, matches):
+    """
+    Walk the saved frontiers back from the end point and collect the diagonal (matching) moves.
+    """
+    found = []
+    while d >= 0:
+        if d == 0:
+            if x > 0:
+                found.append((alo, blo, x))
+            break
+        prev = trace[d - 1]
+        if k == -d or (k != d and prev[k - 1 + d - 1] < prev[k + 1 + d - 1]):
+            prev_k = k + 1
+            start_x = prev[prev_k + d - 1]
+        else:
+            prev_k = k - 1
+            start_x = prev[prev_k + d - 1] + 1
+        if x > start_x:
+            found.append((alo + start_x, blo + start_x - k, x - start_x))
+        x = prev[prev_k + d - 1]
+        k = prev_k
+        d -= 1
+    found.reverse()
+    matches.extend(found)
+
+
+def _match_range(a, alo, ahi, b, blo, bhi, matches):
+    """
+    Find matching blocks (i, j, size) between a[alo:ahi] and b[blo:bhi], in order.
+    """
+    # Common prefix and suffix never need a real diff
+    prefix = 0
+    while alo + prefix < ahi and blo + prefix < bhi and a[alo + prefix] == b[blo + prefix]:
+        prefix += 1
+    if prefix:
+        matches.append((alo, blo, prefix))
+        alo += prefix
+        blo += prefix
+    suffix = 0
+    while alo < ahi - suffix and blo < bhi - suffix and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+        suffix += 1
+    ahi -= suffix
+    bhi -= suffix
+    if alo < ahi and blo < bhi:
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            run_i = run_j = -1
+            run_size = 0
+            for i, j in anchors:
+                if i == alo and j == blo and run_size:
+                    # Consecutive anchors extend the current block
+                    run_size += 1
+                else:
+                    if run_size:
+                        matches.append((run_i, run_j, run_size))
+                    if i > alo and j > blo:
+                        _match_range(a, alo, i, b, blo, j, matches)
+                    run_i, run_j, run_size = i, j, 1
+                alo = i + 1
+                blo = j + 1
+            matches.append((run_i, run_j, run_size))
+            if alo < ahi and blo < bhi:
+                _match_range(a, alo, ahi, b, blo, bhi, matches)
+        elif not set(a[alo:ahi]).isdisjoint(b[blo:bhi]):
+            _myers(a, alo, ahi, b, blo, bhi, matches)
+    if suffix:
+        matches.append((ahi, bhi, suffix))
+
+
+def diff_lines(a, b):
+    """
+    Diff two lists of lines (patience diff with a Myers fallback).
+    Returns opcodes in the same format as difflib.SequenceMatcher.get_opcodes().
+    """
+    matches = []
+    _match_range(a, 0, len(a), b, 0, len(b), matches)
+    matches.append((len(a), len(b), 0))
+    opcodes = []
+    i = j = 0
+    for mi, mj, size in matches:
+        if mi > i and mj > j:
+            opcodes.append(("replace", i, mi, j, mj))
+        elif mi > i:
+            opcodes.append(("delete", i, mi, j, j))
+        elif mj > j:
+            opcodes.append(("insert", i, i, j, mj))
+        if size:
+            # Adjacent blocks (e.g. consecutive anchors) are merged into one equal run
+            if opcodes and opcodes[-1][0] == "equal" and opcodes[-1][2] == mi:
+                opcodes[-1] = ("equal", opcodes[-1][1], mi + size, opcodes[-1][3], mj + size)
+            else:
+                opcodes.append(("equal", mi, mi + size, mj, mj + size))
+        i = mi + size
+        j = mj + size
+    return opcodes
+
+
+def to_disk_bytes(text, encoding=None):
+    """
+    Encode text exactly like open(path, "w").write(text) would on this platform.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode(encoding or locale.getpreferredencoding(False))
+
+
+def _changed_range(old, new):
+    """
+    Return (start, end) of the smallest byte range that differs between two equal-length byte strings.
+    """
+    size = len(old)
+    start = 0
+    while start < size and old[start:start + BLOCK_SIZE] == new[start:start + BLOCK_SIZE]:
+        start += BLOCK_SIZE
+    while start < size and old[start] == new[start]:
+        start += 1
+    end = size
+    while end - BLOCK_SIZE > start and old[end - BLOCK_SIZE:end] == new[end - BLOCK_SIZE:end]:
+        end -= BLOCK_SIZE
+    while end > start and old[end - 1] == new[end - 1]:
+        end -= 1
+    return start, end
+
+
+def write_minimal(path, old_bytes, new_bytes):
+    """
+    Write new_bytes to path, touching as little of the file as possible when old_bytes
+    is what is currently on disk: appends are appended and same-length edits are
+    patched in place; anything else rewrites the file.
+    Returns "unchanged", "append", "patch" or "rewrite".
+    """
+    if old_bytes is not None:
+        try:
+            on_disk = os.path.getsize(path)
+        except OSError:
+            on_disk = -1
+        if on_disk == len(old_bytes):
+            if new_bytes == old_bytes:
+                return "unchanged"
+            if len(new_bytes) > len(old_bytes) and new_bytes.startswith(old_bytes):
+                with open(path, "ab") as f:
+                    f.write(new_bytes[len(old_bytes):])
+                return "append"
+            if len(new_bytes) == len(old_bytes):
+                start, end = _changed_range(old_bytes, new_bytes)
+                with open(path, "r+b") as f:
+                    f.seek(start)
+                    f.write(new_bytes[start:end])
+                return "patch"
+    with open(path, "wb") as f:
+        f.write(new_bytes)
+    return "rewrite"
+
+
+# Class holding the last saved version of a document as a list of parts, so appends stay cheap.
+# With compact storage on, the version is kept zlib-compressed until it is needed.
+class Snapshot:
+    def __init__(self, text="", path=None, compact=False):
+        self.compact = compact
+        self._parts = [text]
+        self._compact_text = None
+        self.path = path  # File the snapshot was loaded from or saved to
+        if compact:
+            self.set_compact(True)
+
+    def set(self, text, path=None):
+        """
+        Replace the snapshot with a new version.
+        """
+        if self.compact:
+            self._parts = []
+            self._compact_text = CompactText(text)
+        else:
+            self._parts = [text]
+            self._compact_text = None
+        self.path = path
+
+    def append(self, text):
+        """
+        Record text appended to the document (e.g. tailed from disk) without copying the rest.
+        """
+        if self._compact_text is not None:
+            self._compact_text.append(text)
+        else:
+            self._parts.append(text)
+
+    def text(self):
+        """
+        Return the snapshot as a single string.
+        """
+        if self._compact_text is not None:
+            return self._compact_text.text()
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0]
+
+    def set_compact(self, compact):
+        """
+        Switch between plain and compressed storage, keeping the current version.
+        """
+        current = self.text()
+        self.compact = compact
+        self.set(current, self.path)
+
+    def memory(self):
+        """
+        Return (stored bytes, uncompressed bytes).
+        """
+        if self._compact_text is not None:
+            return self._compact_text.memory()
+        size = sum(sys.getsizeof(part) for part in self._parts)
+        return size, size
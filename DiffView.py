@@ -0,0 +1,143 @@
+from bisect import bisect_right
+from tkinter import *
+from tkinter import font
+from DiffEngine import diff_lines
+
+
+# Side-by-side view of the differences between two versions that only renders the visible rows
+class DiffView(Toplevel):
+    def __init__(self, master, old_lines, new_lines, title="Changes Since Save"):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("1000x600")
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.opcodes = diff_lines(old_lines, new_lines)
+        # First display row of every opcode; changed blocks take as many rows as their longer side
+        self._row_starts = []
+        rows = 0
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            self._row_starts.append(rows)
+            rows += max(i2 - i1, j2 - j1)
+        self.total_rows = rows
+        self.top_row = 0
+        self._build()
+
+    def _build(self):
+        """
+        Create the toolbar and the two panes sharing one scrollbar.
+        """
+        toolbar = Frame(self)
+        toolbar.pack(side=TOP, fill=X)
+        prev_button = Button(toolbar, text="Previous Change", command=self.previous_change)
+        prev_button.pack(side=LEFT, padx=5, pady=5)
+        next_button = Button(toolbar, text="Next Change", command=self.next_change)
+        next_button.pack(side=LEFT, padx=5, pady=5)
+        changes = sum(1 for opcode in self.opcodes if opcode[0] != "equal")
+        summary_label = Label(toolbar, text=f"{changes} changed block(s)")
+        summary_label.pack(side=LEFT, padx=5)
+
+        body = Frame(self)
+        body.pack(fill=BOTH, expand=True)
+        self.scroll_bar = Scrollbar(body, command=self._on_scroll)
+        self.scroll_bar.pack(side=RIGHT, fill=Y)
+        self.panes = []
+        for heading in ("Saved", "Current"):
+            pane = Frame(body)
+            pane.pack(side=LEFT, fill=BOTH, expand=True)
+            pane_label = Label(pane, text=heading, anchor=W)
+            pane_label.pack(side=TOP, fill=X)
+            view = Text(pane, wrap=NONE, font=("Courier", 10), state=DISABLED)
+            view.pack(fill=BOTH, expand=True)
+            view.tag_config("delete", background="#ffd7d7")
+            view.tag_config("insert", background="#d7ffd7")
+            view.tag_config("replace", background="#fff3c4")
+            view.tag_config("filler", background="#eeeeee")
+            view.bind("<Configure>", lambda event: self.render())
+            view.bind("<MouseWheel>", lambda event: self._scroll_rows(-event.delta // 120 * 3))
+            view.bind("<Button-4>", lambda event: self._scroll_rows(-3))
+            view.bind("<Button-5>", lambda event: self._scroll_rows(3))
+            self.panes.append(view)
+        self._line_height = font.Font(font=self.panes[0].cget("font")).metrics("linespace")
+        self.bind("<Next>", lambda event: self._scroll_rows(self._visible_rows()))
+        self.bind("<Prior>", lambda event: self._scroll_rows(-self._visible_rows()))
+
+    def _visible_rows(self):
+        return max(1, self.panes[0].winfo_height() // self._line_height)
+
+    def _row(self, row):
+        """
+        Return (tag, old line index or None, new line index or None) for a display row.
+        """
+        k = bisect_right(self._row_starts, row) - 1
+        tag, i1, i2, j1, j2 = self.opcodes[k]
+        offset = row - self._row_starts[k]
+        old_index = i1 + offset if i1 + offset < i2 else None
+        new_index = j1 + offset if j1 + offset < j2 else None
+        return tag, old_index, new_index
+
+    def render(self):
+        """
+        Redraw only the rows that fit in the window.
+        """
+        last_row = min(self.total_rows, self.top_row + self._visible_rows())
+        sides = ((self.panes[0], self.old_lines, 1), (self.panes[1], self.new_lines, 2))
+        rows = [self._row(row) for row in range(self.top_row, last_row)]
+        for view, lines, side in sides:
+            content = []
+            tags = []
+            for number, row in enumerate(rows, 1):
+                index = row[side]
+                if index is None:
+                    content.append("")
+                    tags.append((number, "filler"))
+                else:
+                    content.append(f"{index + 1:>7} {lines[index]}")
+                    if row[0] != "equal":
+                        tags.append((number, row[0]))
+            view.config(state=NORMAL)
+            view.delete("1.0", END)
+            view.insert("1.0", "\n".join(content))
+            for number, tag in tags:
+                view.tag_add(tag, f"{number}.0", f"{number + 1}.0")
+            view.config(state=DISABLED)
+        if self.total_rows:
+            self.scroll_bar.set(self.top_row / self.total_rows, last_row / self.total_rows)
+        else:
+            self.scroll_bar.set(0, 1)
+
+    def _scroll_rows(self, delta):
+        self.scroll_to(self.top_row + delta)
+
+    def scroll_to(self, row):
+        """
+        Make the given row the first visible one.
+        """
+        self.top_row = max(0, min(row, self.total_rows - self._visible_rows()))
+        self.render()
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total_rows))
+        elif unit == "pages":
+            self._scroll_rows(int(amount) * self._visible_rows())
+        else:
+            self._scroll_rows(int(amount))
+
+    def next_change(self):
+        """
+        Scroll to the next changed block below the top of the view.
+        """
+        for k, opcode in enumerate(self.opcodes):
+            if opcode[0] != "equal" and self._row_starts[k] > self.top_row:
+                self.scroll_to(self._row_starts[k])
+                return
+
+    def previous_change(self):
+        """
+        Scroll to the previous changed block above the top of the view.
+        """
+        for k in range(len(self.opcodes) - 1, -1, -1):
+            if self.opcodes[k][0] != "equal" and self._row_starts[k] < self.top_row:
+                self.scroll_to(self._row_starts[k])
+                return
@@ -0,0 +1,127 @@
+from tkinter import TclError
+
+# Tcl proc that stands in for the widget command. Only edits call back into Python; errors
+# of the real command reach the caller unchanged.
+PROXY = """
+proc {%(widget)s} args {
+    if {[lindex $args 0] ni {insert delete replace}} {
+        return [{%(orig)s} {*}$args]
+    }
+    %(before)s {*}$args
+    catch {{%(orig)s} {*}$args} result options
+    %(after)s
+    return -options $options $result
+}
+"""
+
+
+# Reports every change to a Text widget, however it was made (typing, pastes, undo and redo,
+# inserts from code), by putting a Tcl proc in place of the widget command. Listeners are
+# called with (first line, old text of the changed lines, new text of those lines), so they
+# can follow edits without reading the whole document. The proc is only there while someone
+# listens, and can be taken out for operations that make many edits (see pause).
+class EditObserver:
+    def __init__(self, text):
+        self.text = text
+        self.listeners = []
+        self._orig = text._w + "_observed"
+        self._installed = False
+        self._paused = 0
+        self._edits = []  # Stack of (first line, last line, line count, old text), None if not tracked
+        self._before_hook = text.register(self._before)
+        self._after_hook = text.register(self._after)
+        text.bind("<Destroy>", self._remove, add="+")
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        self._update()
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+        self._update()
+
+    def pause(self, first="insert", last="insert"):
+        """
+        Stop observing, e.g. before an operation that makes many edits, until resume() is
+        called. Lines first to last (Text indexes) must hold all the edits made meanwhile;
+        what they become is then reported as one edit.
+        """
+        self._paused += 1
+        if self._paused == 1:
+            self._before("delete", first, last)
+            self._update()
+
+    def resume(self):
+        self._paused -= 1
+        if self._paused == 0:
+            self._update()
+            self._after()
+
+    def _update(self):
+        # Every edit through the proc calls into Python twice, so it is only there when needed
+        wanted = bool(self.listeners) and not self._paused
+        if wanted == self._installed:
+            return
+        tk = self.text.tk
+        if wanted:
+            tk.call("rename", self.text._w, self._orig)
+            tk.eval(PROXY % {"widget": self.text._w, "orig": self._orig,
+                             "before": self._before_hook, "after": self._after_hook})
+        else:
+            tk.call("rename", self.text._w, "")
+            tk.call("rename", self._orig, self.text._w)
+        self._installed = wanted
+
+    def _call(self, *args):
+        return self.text.tk.call(self._orig if self._installed else self.text._w, *args)
+
+    def _line(self, index):
+        return int(str(self._call("index", index)).split(".")[0])
+
+    def _before(self, operation, *args):
+        if not self.listeners:
+            self._edits.append(None)
+            return
+        try:
+            last_line = self._line("end-1c")
+            if operation == "insert":
+                indexes = args[:1]
+            elif operation == "delete":
+                # A lone index (or a lone last index) deletes one character
+                indexes = args + (f"{args[-1]}+1c",) if len(args) % 2 else args
+            else:
+                indexes = args[:2]
+            lines = [min(self._line(index), last_line) for index in indexes]
+            first, last = min(lines), max(lines)
+            old = self._call("get", f"{first}.0", f"{last}.0 lineend")
+            self._edits.append((first, last, last_line, old))
+        except TclError:
+            self._edits.append(None)  # The edit itself fails with the same error
+
+    def _after(self):
+        edit = self._edits.pop()
+        if edit is None:
+            return
+        first, last, last_line, old = edit
+        try:
+            # Lines added or removed by the edit are all in the changed range
+            last += self._line("end-1c") - last_line
+            new = self._call("get", f"{first}.0", f"{last}.0 lineend")
+        except TclError as e:
+            print(f"Error reading an edit: {e}")
+            return
+        if new == old:
+            return
+        for listener in list(self.listeners):
+            try:
+                listener(first, old, new)
+            except Exception as e:
+                print(f"Error in edit listener: {e}")
+
+    def _remove(self, event):
+        if event.widget is self.text and self._installed:
+            self._installed = False
+            try:
+                self.text.tk.call("rename", self.text._w, "")
+            except TclError:
+                pass
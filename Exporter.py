@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pygments.formatters import HtmlFormatter, RtfFormatter, Terminal256Formatter
+from pygments.lexers import get_lexer_by_name, TextLexer
+from pygments.token import string_to_tokentype
+from pygments.util import ClassNotFound
+from SyntaxHighlighter import scan_checkpoints
+
+FORMATS = {"html": ".html", "rtf": ".rtf", "ansi": ".ans"}
+PARALLEL_LINES = 20000  # Files longer than this are lexed in chunks by worker processes
+CHUNK_LINES = 2000
+
+
+@lru_cache(maxsize=None)
+def get_formatter(fmt, style="default"):
+    """
+    Return the formatter for an export format and style; created once, since building the
+    stylesheet is the expensive part.
+    """
+    if fmt == "html":
+        return HtmlFormatter(style=style, full=True)
+    elif fmt == "rtf":
+        return RtfFormatter(style=style)
+    elif fmt == "ansi":
+        return Terminal256Formatter(style=style)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def get_lexer(language):
+    try:
+        return TextLexer() if language == "text" else get_lexer_by_name(language)
+    except ClassNotFound:
+        return TextLexer()
+
+
+def lex_chunk(code, language):
+    """
+    Lex a chunk in a worker process. Token types go back as strings, since they do not
+    survive pickling as the singletons Pygments compares against.
+    """
+    return [(str(ttype), value) for _, ttype, value in get_lexer(language).get_tokens_unprocessed(code)]
+
+
+def split_at_checkpoints(code, checkpoints):
+    """
+    Split code into chunks of about CHUNK_LINES lines starting at checkpoint lines.
+    Checkpoints that drifted off a top-level line since they were scanned are skipped.
+    """
+    # Split on newlines only, like Tk, Jedi and Pygments; splitlines() also breaks at form feeds
+    lines = code.split("\n")
+    lines = [line + "\n" for line in lines[:-1]] + ([lines[-1]] if lines[-1] else [])
+    starts = [0]
+    for line in checkpoints:
+        if line - 1 - starts[-1] >= CHUNK_LINES and line - 1 < len(lines) and lines[line - 1][:1] not in " \t\r\n":
+            starts.append(line - 1)
+    starts.append(len(lines))
+    for begin, end in zip(starts, starts[1:]):
+        yield "".join(lines[begin:end])
+
+
+# Renders a document to HTML, RTF or ANSI and streams it to a file. Large files are lexed
+# in chunks on a process pool, starting at lexer checkpoints, and formatted as the chunks
+# come back in order, so only a few chunks are held in memory at a time.
+class Exporter:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._executor = None
+        self._writer = ThreadPoolExecutor(max_workers=1)
+
+    def _pool(self):
+        """
+        Return the worker pool. Workers are spawned rather than forked, since forking a
+        process that runs Tk and worker threads is unsafe (and not supported on macOS).
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def tokens(self, code, language, checkpoints=None):
+        """
+        Yield (token type, value) for the whole document.
+        """
+        lexer = get_lexer(language)
+        if code.count("\n") < PARALLEL_LINES or isinstance(lexer, TextLexer):
+            for _, ttype, value in lexer.get_tokens_unprocessed(code):
+                yield ttype, value
+            return
+        if not checkpoints or len(checkpoints) < 2:
+            checkpoints = scan_checkpoints(code, lexer, every=CHUNK_LINES)
+        pool = self._pool()
+        window = (self.max_workers or os.cpu_count() or 1) * 2
+        pending = []
+        for chunk in split_at_checkpoints(code, checkpoints):
+            pending.append(pool.submit(lex_chunk, chunk, language))
+            if len(pending) >= window:
+                yield from self._converted(pending.pop(0).result())
+        for future in pending:
+            yield from self._converted(future.result())
+
+    @staticmethod
+    def _converted(chunk_tokens):
+        for name, value in chunk_tokens:
+            yield string_to_tokentype(name), value
+
+    def export(self, code, language, path, fmt="html", style="default", checkpoints=None):
+        """
+        Write the highlighted document to path.
+        """
+        formatter = get_formatter(fmt, style)
+        with open(path, "w", encoding="utf-8") as outfile:
+            formatter.format(self.tokens(code, language, checkpoints), outfile)
+
+    def submit(self, code, language, path, fmt="html", style="default", checkpoints=None):
+        """
+        Export on a background thread; returns a Future.
+        """
+        return self._writer.submit(self.export, code, language, path, fmt, style, checkpoints)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,120 @@
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from array import array
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".notpad", "state.sqlite3")
+
+
+def newline_index(text):
+    """
+    Return the character offset at which every line starts, as a compact array.
+    """
+    offsets = array("I" if len(text) < 2 ** 32 else "Q", [0])
+    offsets.extend(match.end() for match in re.finditer("\n", text))
+    return offsets
+
+
+def _pack(offsets):
+    return zlib.compress(offsets.typecode.encode() + offsets.tobytes())
+
+
+def _unpack(blob):
+    data = zlib.decompress(blob)
+    offsets = array(data[:1].decode())
+    offsets.frombytes(data[1:])
+    return offsets
+
+
+# Remembers per-file editor state (cursor, language, encoding, folds, lexer checkpoints
+# and the newline index) in a small SQLite database, evicting the least recently used
+# files once the stored data grows past max_bytes
+class FileStateCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                accessed REAL,
+                cursor TEXT,
+                language TEXT,
+                encoding TEXT,
+                state TEXT,
+                newline_index BLOB,
+                nbytes INTEGER
+            )""")
+        self._db.commit()
+
+    @staticmethod
+    def _signature(file_path):
+        st = os.stat(file_path)
+        return st.st_mtime_ns, st.st_size
+
+    def load(self, file_path):
+        """
+        Return the saved state of a file as a dict, or None if there is none or the file
+        changed since it was saved.
+        """
+        file_path = os.path.abspath(file_path)
+        row = self._db.execute(
+            "SELECT mtime_ns, size, cursor, language, encoding, state, newline_index FROM files WHERE path = ?",
+            (file_path,)).fetchone()
+        if row is None:
+            return None
+        try:
+            signature = self._signature(file_path)
+        except OSError:
+            return None
+        self._db.execute("UPDATE files SET accessed = ? WHERE path = ?", (time.time(), file_path))
+        self._db.commit()
+        if (row[0], row[1]) != signature:
+            return None
+        state = json.loads(row[5])
+        state.update(cursor=row[2], language=row[3], encoding=row[4],
+                     newline_index=_unpack(row[6]) if row[6] else None)
+        return state
+
+    def store(self, file_path, cursor, language, encoding, folds=(), checkpoints=(), offsets=None):
+        """
+        Save the state of a file as it is on disk now.
+        """
+        file_path = os.path.abspath(file_path)
+        try:
+            mtime_ns, size = self._signature(file_path)
+        except OSError:
+            return
+        state = json.dumps({"folds": list(folds), "checkpoints": list(checkpoints)})
+        blob = _pack(offsets) if offsets is not None else None
+        nbytes = len(file_path) + len(state) + (len(blob) if blob else 0) + 64
+        self._db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (file_path, mtime_ns, size, time.time(), cursor, language, encoding, state, blob, nbytes))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        """
+        Drop the least recently used entries until the cache fits in max_bytes.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for path, nbytes in self._db.execute("SELECT path, nbytes FROM files ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            total -= nbytes
+
+    def recent_files(self, limit=10):
+        """
+        Return the most recently used files that still exist.
+        """
+        rows = self._db.execute("SELECT path FROM files ORDER BY accessed DESC LIMIT ?", (limit * 2,))
+        return [path for (path,) in rows if os.path.exists(path)][:limit]
@@ -0,0 +1,241 @@
+import codecs
+import io
+import os
+import struct
+
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.inotify_init1
+    _libc.inotify_add_watch
+except Exception:
+    _libc = None
+
+# inotify flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+# Small wrapper around the Linux inotify API used to avoid stat() calls while nothing happens
+class _Inotify:
+    def __init__(self, fd, path):
+        self._fd = fd
+        self._path = path
+        self._watch = -1
+        self.rewatch()
+
+    @classmethod
+    def create(cls, path):
+        """
+        Return an inotify watcher for the path, or None where inotify is unavailable.
+        """
+        if _libc is None:
+            return None
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(fd, path)
+
+    def rewatch(self):
+        """
+        (Re)attach the watch, e.g. after the file was replaced by a rename.
+        """
+        self._watch = _libc.inotify_add_watch(self._fd, os.fsencode(self._path), WATCH_MASK)
+
+    def pending(self):
+        """
+        Drain queued events and return True if any arrived since the last call.
+        """
+        seen = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except (BlockingIOError, OSError):
+                break
+            if not data:
+                break
+            seen = True
+            offset = 0
+            while offset + 16 <= len(data):
+                _, mask, _, name_len = struct.unpack_from("iIII", data, offset)
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self._watch = -1
+                offset += 16 + name_len
+        if self._watch < 0:
+            self.rewatch()
+        return seen
+
+    def close(self):
+        """
+        Release the inotify file descriptor.
+        """
+        os.close(self._fd)
+
+
+# Class to watch a file on disk and report appended data and other changes
+class FileWatcher:
+    CHUNK_SIZE = 64 * 1024  # Bytes read at a time while tailing
+    MAX_BYTES_PER_POLL = 4 * 1024 * 1024  # Leave the rest for the next poll to keep the UI responsive
+    FINGERPRINT_SIZE = 1024  # Bytes before the last known end used to recognise pure appends
+    STAT_EVERY = 10  # With inotify, still stat() every N polls in case events are missed (e.g. NFS)
+
+    def __init__(self, path, on_append, on_change, interval=500, encoding="utf-8"):
+        self.path = path
+        self.on_append = on_append  # Called with the decoded text appended to the file
+        self.on_change = on_change  # Called with the full new content after any other change
+        self.interval = interval
+        self.encoding = encoding
+        self._widget = None
+        self._after_id = None
+        self._polls_since_stat = 0
+        self._behind = False  # Appended data left over from the previous poll
+        self._inotify = _Inotify.create(path)
+        self.mark_synced()
+
+    def _new_decoder(self):
+        """
+        Create an incremental decoder that also translates newlines like text mode does.
+        """
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def _stat(self):
+        """
+        Return (inode, size, mtime) for the watched file, or None if it is missing.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def mark_synced(self):
+        """
+        Record the current file on disk as the version the editor buffer matches.
+        Call this after the editor itself writes the file.
+        """
+        self._state = self._stat()
+        self._decoder = self._new_decoder()
+        self._fingerprint = b""
+        self._offset = 0
+        if self._state is None:
+            return
+        self._offset = self._state[1]
+        start = max(0, self._offset - self.FINGERPRINT_SIZE)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                self._fingerprint = f.read(self._offset - start)
+        except OSError:
+            self._fingerprint = b""
+
+    def changed_on_disk(self):
+        """
+        Return True if the file changed since the buffer was last synced with it.
+        """
+        return self._stat() != self._state
+
+    def start(self, widget):
+        """
+        Start polling through the Tk event loop of the given widget.
+        """
+        self._widget = widget
+        self._schedule(self.interval)
+
+    def stop(self):
+        """
+        Stop polling and release resources.
+        """
+        if self._widget is not None and self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+        self._after_id = None
+        self._widget = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _schedule(self, delay):
+        if self._widget is not None:
+            self._after_id = self._widget.after(delay, self._tick)
+
+    def _tick(self):
+        try:
+            more = self.poll()
+        except OSError as e:
+            print(f"Error watching file: {e}")
+            more = False
+        self._schedule(1 if more else self.interval)
+
+    def poll(self):
+        """
+        Check the file once. Appends are tailed into on_append, other changes go to on_change.
+        Returns True if appended data is still pending and the caller should poll again soon.
+        """
+        if self._inotify is not None and not self._behind and self._polls_since_stat < self.STAT_EVERY:
+            self._polls_since_stat += 1
+            if not self._inotify.pending():
+                return False
+        self._polls_since_stat = 0
+        state = self._stat()
+        if state is None or state == self._state:
+            return False
+        if self._state is not None and state[0] == self._state[0] and state[1] > self._offset \
+                and self._fingerprint_matches():
+            return self._tail(state)
+        self._reload()
+        return False
+
+    def _fingerprint_matches(self):
+        """
+        Check that the bytes before the last known end are unchanged, i.e. the file only grew.
+        """
+        start = self._offset - len(self._fingerprint)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(len(self._fingerprint)) == self._fingerprint
+
+    def _tail(self, state):
+        """
+        Read newly appended bytes in fixed-size chunks so memory use stays constant.
+        """
+        budget = self.MAX_BYTES_PER_POLL
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while budget > 0:
+                chunk = f.read(min(self.CHUNK_SIZE, budget))
+                if not chunk:
+                    break
+                self._offset += len(chunk)
+                budget -= len(chunk)
+                self._fingerprint = (self._fingerprint + chunk)[-self.FINGERPRINT_SIZE:]
+                decoded = self._decoder.decode(chunk)
+                if decoded:
+                    self.on_append(decoded)
+        more = self._behind = self._offset < state[1]
+        self._state = (state[0], self._offset, None if more else state[2])
+        return more
+
+    def _reload(self):
+        """
+        Re-read the whole file after a change that is not a pure append.
+        """
+        if self._inotify is not None:
+            self._inotify.rewatch()
+        state = self._stat()
+        if state is None:
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self._state = (state[0], len(data), state[2] if len(data) == state[1] else None)
+        self._offset = len(data)
+        self._behind = False
+        self._fingerprint = data[-self.FINGERPRINT_SIZE:]
+        self._decoder = self._new_decoder()
+        self.on_change(self._decoder.decode(data))
@@ -0,0 +1,133 @@
+from bisect import bisect_left, bisect_right
+
+
+def indent_of(line, tab_size=4):
+    """
+    Return the indentation width of a line, or None for a blank line.
+    """
+    stripped = line.lstrip()
+    if not stripped:
+        return None
+    leading = line[:len(line) - len(stripped)]
+    return len(leading.expandtabs(tab_size))
+
+
+def compute_regions(indents, lo, hi):
+    """
+    Return sorted (header, last) fold regions for lines lo..hi-1 (0-based indexes into indents).
+    A region folds the lines after a header that are indented deeper than it, up to the
+    last non-blank one; header and last are 1-based line numbers.
+    """
+    regions = []
+    stack = []
+    last_code = None
+    for i in range(lo, hi):
+        indent = indents[i]
+        if indent is None:
+            continue
+        while stack and stack[-1][0] >= indent:
+            _, header = stack.pop()
+            if last_code > header:
+                regions.append((header + 1, last_code + 1))
+        stack.append((indent, i))
+        last_code = i
+    while stack:
+        _, header = stack.pop()
+        if last_code > header:
+            regions.append((header + 1, last_code + 1))
+    regions.sort()
+    return regions
+
+
+# Fold regions of a document, kept up to date incrementally: after an edit only the
+# top-level block(s) around the changed lines are recomputed and later regions are shifted.
+class FoldIndex:
+    def __init__(self):
+        self.lines = []
+        self.indents = []
+        self.regions = []  # Sorted (header, last) pairs, nested regions included
+        self._headers = []
+
+    def load(self, lines):
+        """
+        Index a whole document given as a list of lines.
+        """
+        self.lines = list(lines)
+        self.indents = [indent_of(line) for line in self.lines]
+        self._set_regions(compute_regions(self.indents, 0, len(self.indents)))
+
+    def _set_regions(self, regions):
+        self.regions = regions
+        self._headers = [header for header, _ in regions]
+
+    def update(self, lines):
+        """
+        Bring the index up to date with a new version of the document.
+        Returns False if nothing changed.
+        """
+        old = self.lines
+        top = 0
+        limit = min(len(old), len(lines))
+        while top < limit and old[top] == lines[top]:
+            top += 1
+        if top == len(old) == len(lines):
+            return False
+        bottom = 0
+        while bottom < limit - top and old[-1 - bottom] == lines[-1 - bottom]:
+            bottom += 1
+        self.replace_lines(top, len(old) - top - bottom, lines[top:len(lines) - bottom])
+        return True
+
+    def replace_lines(self, start, old_count, new_lines):
+        """
+        Replace old_count lines at 0-based index start with new_lines and repair the regions.
+        """
+        delta = len(new_lines) - old_count
+        self.lines[start:start + old_count] = new_lines
+        self.indents[start:start + old_count] = [indent_of(line) for line in new_lines]
+        # Widen to unchanged top-level lines around the edit; no region reaches across them
+        lo = min(start, len(self.indents)) - 1
+        while lo > 0 and self.indents[lo] != 0:
+            lo -= 1
+        lo = max(lo, 0)
+        hi = start + len(new_lines)
+        while hi < len(self.indents) and self.indents[hi] != 0:
+            hi += 1
+        # Regions with headers in the old span are replaced, the ones after it are shifted
+        first = bisect_left(self._headers, lo + 1)
+        last = bisect_right(self._headers, hi - delta)
+        shifted = [(header + delta, end + delta) for header, end in self.regions[last:]]
+        self._set_regions(self.regions[:first] + compute_regions(self.indents, lo, hi) + shifted)
+
+    def region_at(self, line):
+        """
+        Return the innermost region whose header is the line or that contains it, or None.
+        """
+        index = bisect_right(self._headers, line) - 1
+        if index >= 0 and self.regions[index][0] == line:
+            return self.regions[index]
+        # Nested regions have later headers, so the first match walking back is the innermost
+        for header, last in reversed(self.regions[:index + 1]):
+            if header < line <= last:
+                return (header, last)
+        return None
+
+    def region_starting_near(self, line, window=5):
+        """
+        Return the first region whose header is within window lines after line (e.g. below a
+        multi-line signature), or None.
+        """
+        index = bisect_left(self._headers, line)
+        if index < len(self.regions) and self.regions[index][0] <= line + window:
+            return self.regions[index]
+        return None
+
+    def top_level_regions(self):
+        """
+        Return the regions that are not nested in another region.
+        """
+        result = []
+        for region in self.regions:
+            if not result or region[0] > result[-1][1]:
+                result.append(region)
+        return result
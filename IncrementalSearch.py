@@ -0,0 +1,279 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from FileStateCache import newline_index
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+WINDOW = 1 << 20  # Characters scanned between checks for a newer search
+CHECK_EVERY = 10000  # Matches between checks when the text cannot be cut into windows
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+def _looks_ahead(value):
+    if isinstance(value, sre_parse.SubPattern):
+        return any(op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT) and av[0] == 1 or _looks_ahead(av)
+                   for op, av in value)
+    if isinstance(value, (tuple, list)):
+        return any(_looks_ahead(item) for item in value)
+    return False
+
+
+def match_reach(pattern):
+    """
+    Return how many characters a match of a compiled pattern can span, or None if that has
+    no useful bound or the pattern looks ahead of its match.
+    """
+    parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    if _looks_ahead(parsed):
+        return None
+    width = parsed.getwidth()[1]
+    return width if width < WINDOW // 2 else None
+
+
+def find_matches(code, query, match_case=False, regex=False, is_current=lambda: True, folded=None):
+    """
+    Return (starts, ends) arrays of the character offsets of every match, in order.
+    folded is code.lower() when it has the same length, which makes plain case-insensitive
+    searches much faster than re.IGNORECASE. Raises SearchCancelled once is_current() turns false.
+    The text is scanned in windows of WINDOW characters, checking is_current() between them.
+    """
+    typecode = "I" if len(code) < 2 ** 32 else "Q"
+    starts = array(typecode)
+    ends = array(typecode)
+    if not query:
+        return starts, ends
+    if regex:
+        pattern = re.compile(query, 0 if match_case else re.IGNORECASE)
+    elif not match_case and folded is not None:
+        pattern = re.compile(re.escape(query.lower()))
+        code = folded
+    else:
+        pattern = re.compile(re.escape(query), 0 if match_case else re.IGNORECASE)
+
+    def add(batch):
+        if not is_current():
+            raise SearchCancelled()
+        if regex:
+            batch = [match for match in batch if match.end() > match.start()]  # Empty matches cannot be shown
+        starts.extend(map(re.Match.start, batch))
+        ends.extend(map(re.Match.end, batch))
+
+    reach = match_reach(pattern)
+    if reach is None:
+        # A match could span any number of windows, so scan the whole text in one go
+        matches = pattern.finditer(code)
+        while True:
+            batch = list(islice(matches, CHECK_EVERY))
+            if not batch:
+                return starts, ends
+            add(batch)
+    pos = 0
+    while pos < len(code):
+        endpos = pos + WINDOW
+        if endpos < len(code):
+            # A match starting before limit reads (and checks anchors) only inside the window,
+            # so it is the match the whole text has there; later ones are left to the next window
+            limit = endpos - reach - 2
+        else:
+            endpos, limit = len(code), len(code) + 1
+        batch = []
+        for match in pattern.finditer(code, pos, endpos):
+            if match.start() >= limit:
+                break
+            batch.append(match)
+        add(batch)
+        pos = max(batch[-1].end() if batch else pos, limit)
+    return starts, ends
+
+
+# Text of the document at one point in time, with the newline index and lowercased copy
+# that queries on it need. Those are computed by the search worker on first use and shared
+# by every later query on the same snapshot, never by queries on another one.
+class _Snapshot:
+    def __init__(self, code):
+        self.code = code
+        self.line_starts = None
+        self.folded = None  # code.lower() if it has the same length, False if not
+
+    def prepare(self, seed=None, fold=False):
+        """
+        Compute what a query needs (runs on the worker). seed is (length, hash, newline index)
+        of some version of the document and is used if that text is this snapshot's.
+        """
+        if self.line_starts is None:
+            if seed is not None and seed[0] == len(self.code) and seed[1] == hash(self.code):
+                self.line_starts = seed[2]
+            else:
+                self.line_starts = newline_index(self.code)
+        if fold and self.folded is None:
+            folded = self.code.lower()
+            self.folded = folded if len(folded) == len(self.code) else False
+
+
+# Search-as-you-type for a Text widget. Matching runs on a worker against a snapshot of the
+# document, and a newer query cancels the one in progress. All matches are kept as sorted
+# offsets for counting and next/previous; only the ones in the viewport are tagged.
+class IncrementalSearch:
+    POLL_MS = 20
+
+    def __init__(self, text, on_update=None):
+        self.text = text
+        self.on_update = on_update  # Called after a search finishes or the current match moves
+        self.query = ""
+        self.match_case = False
+        self.regex = False
+        self.starts = array("I")
+        self.ends = array("I")
+        self.current = None  # Index of the selected match
+        self.error = None
+        self._generation = 0
+        self._snapshot = None
+        self._line_starts = array("I", [0])  # Newline index of the snapshot the matches are from
+        self._seed = None  # (length, hash, newline index) known from elsewhere, e.g. the file state cache
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        text.tag_config("search_match", background="yellow")
+        text.tag_config("search_current", background="orange")
+        text.tag_raise("search_current", "search_match")
+
+    def refresh_snapshot(self):
+        """
+        Take a new snapshot of the document (call when it may have been edited).
+        """
+        self._snapshot = None
+
+    def seed_line_starts(self, code, line_starts):
+        """
+        Offer a newline index already known for a version of the document, such as the one
+        cached when the file was last saved. Only the length and hash of the text are kept, and
+        only the next search uses it: if its snapshot is that text, the newline scan is skipped.
+        Pass None to forget it.
+        """
+        self._seed = (len(code), hash(code), line_starts) if line_starts is not None else None
+
+    def search(self, query, match_case=False, regex=False):
+        """
+        Start searching for a query; earlier searches still running are cancelled.
+        """
+        self._generation += 1
+        generation = self._generation
+        self.query = query
+        self.match_case = match_case
+        self.regex = regex
+        if self._snapshot is None:
+            self._snapshot = _Snapshot(self.text.get("1.0", "end-1c"))
+        snapshot = self._snapshot
+        seed, self._seed = self._seed, None
+
+        def work():
+            is_current = lambda: generation == self._generation
+            if not is_current():
+                raise SearchCancelled()  # Superseded before it even started
+            snapshot.prepare(seed, fold=not match_case and not regex)
+            starts, ends = find_matches(snapshot.code, query, match_case, regex, is_current, snapshot.folded or None)
+            return starts, ends, snapshot.line_starts
+        future = self._executor.submit(work)
+
+        def check_done():
+            if generation != self._generation:
+                return
+            if not future.done():
+                self.text.after(self.POLL_MS, check_done)
+                return
+            try:
+                self.starts, self.ends, self._line_starts = future.result()
+                self.error = None
+            except SearchCancelled:
+                return
+            except re.error as e:
+                self.starts, self.ends = array("I"), array("I")
+                self.error = str(e)
+            self.current = None
+            self.highlight_visible()
+            if self.on_update:
+                self.on_update()
+        self.text.after(self.POLL_MS, check_done)
+
+    def clear(self):
+        self._generation += 1
+        self._snapshot = None
+        self.query = ""
+        self.starts, self.ends = array("I"), array("I")
+        self.current = None
+        self.text.tag_remove("search_match", "1.0", "end")
+        self.text.tag_remove("search_current", "1.0", "end")
+
+    def index(self, offset):
+        """
+        Convert a character offset into a Text index.
+        """
+        line = bisect_right(self._line_starts, offset)
+        return f"{line}.{offset - self._line_starts[line - 1]}"
+
+    def offset(self, index):
+        line, column = map(int, self.text.index(index).split("."))
+        if line - 1 >= len(self._line_starts):
+            return self._line_starts[-1]
+        return self._line_starts[line - 1] + column
+
+    def highlight_visible(self, event=None):
+        """
+        Tag the matches on the visible lines.
+        """
+        self.text.tag_remove("search_match", "1.0", "end")
+        self.text.tag_remove("search_current", "1.0", "end")
+        if not self.starts:
+            return
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        low = self._line_starts[min(first, len(self._line_starts)) - 1]
+        high = self._line_starts[last] if last < len(self._line_starts) else self.ends[-1]
+        begin = bisect_left(self.ends, low + 1)
+        end = bisect_left(self.starts, high)
+        ranges = []
+        for k in range(begin, end):
+            ranges += [self.index(self.starts[k]), self.index(self.ends[k])]
+        if ranges:
+            self.text.tag_add("search_match", *ranges)
+        if self.current is not None:
+            self.text.tag_add("search_current", self.index(self.starts[self.current]),
+                              self.index(self.ends[self.current]))
+
+    def select(self, k):
+        """
+        Make match k the current one and scroll to it.
+        """
+        self.current = k
+        start, end = self.index(self.starts[k]), self.index(self.ends[k])
+        self.text.mark_set("insert", end)
+        self.text.see(start)
+        self.highlight_visible()
+        if self.on_update:
+            self.on_update()
+
+    def next_match(self, event=None):
+        if not self.starts:
+            return "break"
+        if self.current is not None:
+            k = (self.current + 1) % len(self.starts)
+        else:
+            k = bisect_left(self.starts, self.offset("insert")) % len(self.starts)
+        self.select(k)
+        return "break"
+
+    def previous_match(self, event=None):
+        if not self.starts:
+            return "break"
+        if self.current is not None:
+            k = (self.current - 1) % len(self.starts)
+        else:
+            k = (bisect_left(self.starts, self.offset("insert")) - 1) % len(self.starts)
+        self.select(k)
+        return "break"
@@ -0,0 +1,179 @@
+import codecs
+import io
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+
+# Class to stream data appended to a file (or piped to stdin) into a Text widget
+class LogTail:
+    CHUNK_SIZE = 64 * 1024  # Bytes read at a time by the reader thread
+    QUEUE_SIZE = 256  # Batches buffered between the reader and the UI before the reader waits
+    FRAME_MS = 16  # The widget is updated at most once per frame
+    MAX_CHARS_PER_FRAME = 1024 * 1024  # Leave the rest for the next frame if the UI falls behind
+
+    def __init__(self, text, path=None, max_lines=10000, filters=None, from_start=False,
+                 poll_interval=0.25, encoding="utf-8"):
+        self.text = text
+        self.path = path  # None reads from standard input
+        self.max_lines = max_lines  # Scrollback size, older lines are trimmed
+        self.filters = [(re.compile(pattern), tag) for pattern, tag in (filters or [])]
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+        self.encoding = encoding
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = None
+        self._after_id = None
+        self._pending = ""
+
+    def start(self):
+        """
+        Start the reader thread and the per-frame widget updates.
+        """
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        self._after_id = self.text.after(self.FRAME_MS, self._drain)
+
+    def stop(self):
+        """
+        Stop following. The reader thread exits at its next read.
+        """
+        self._stop.set()
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _new_decoder(self):
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def _put(self, data):
+        """
+        Hand a batch to the UI, waiting while the queue is full so memory stays bounded.
+        """
+        while not self._stop.is_set():
+            try:
+                self._queue.put(data, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                pass
+
+    def _read_loop(self):
+        try:
+            if self.path is None:
+                self._read_pipe(sys.stdin.buffer)
+            else:
+                self._read_file()
+        except (OSError, ValueError) as e:
+            self._put(f"\n[Tail stopped: {e}]\n")
+
+    def _read_pipe(self, stream):
+        """
+        Read a pipe until EOF, forwarding whatever is available at each read.
+        """
+        decoder = self._new_decoder()
+        read = getattr(stream, "read1", stream.read)
+        while not self._stop.is_set():
+            chunk = read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            data = decoder.decode(chunk)
+            if data:
+                self._put(data)
+
+    def _read_file(self):
+        """
+        Follow a file like `tail -F`, reopening it after rotation or truncation.
+        """
+        f = open(self.path, "rb")
+        try:
+            if not self.from_start:
+                f.seek(0, os.SEEK_END)
+            decoder = self._new_decoder()
+            while not self._stop.is_set():
+                chunk = f.read(self.CHUNK_SIZE)
+                if chunk:
+                    data = decoder.decode(chunk)
+                    if data:
+                        self._put(data)
+                    continue
+                time.sleep(self.poll_interval)
+                try:
+                    st = os.stat(self.path)
+                except OSError:
+                    continue
+                if st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell():
+                    f.close()
+                    f = open(self.path, "rb")
+                    decoder = self._new_decoder()
+        finally:
+            f.close()
+
+    def _drain(self):
+        """
+        Insert everything that arrived since the last frame with a single widget update.
+        """
+        parts = [self._pending]
+        size = len(self._pending)
+        while size < self.MAX_CHARS_PER_FRAME:
+            try:
+                data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            parts.append(data)
+            size += len(data)
+        batch = "".join(parts)
+        self._pending = batch[self.MAX_CHARS_PER_FRAME:]
+        batch = batch[:self.MAX_CHARS_PER_FRAME]
+        if batch:
+            self._insert(batch)
+        if not self._stop.is_set():
+            self._after_id = self.text.after(self.FRAME_MS, self._drain)
+
+    def _insert(self, batch):
+        text = self.text
+        at_bottom = text.yview()[1] >= 1.0
+        first_line = int(text.index("end-1c").split(".")[0])
+        first_col = int(text.index("end-1c").split(".")[1])
+        # Log output is not an edit: keep it out of the undo history and the modified flag
+        modified = text.edit_modified()
+        undo = text.cget("undo")
+        text.config(undo=False)
+        text.insert("end-1c", batch)
+        if self.filters:
+            self._apply_filters(batch, first_line, first_col)
+        self._trim()
+        text.config(undo=undo)
+        text.edit_modified(modified)
+        if at_bottom:
+            text.see("end")
+
+    def _apply_filters(self, batch, first_line, first_col):
+        """
+        Tag filter matches in the newly inserted text only.
+        """
+        for line_offset, line in enumerate(batch.split("\n")):
+            line_num = first_line + line_offset
+            col_base = first_col if line_offset == 0 else 0
+            for pattern, tag in self.filters:
+                for match in pattern.finditer(line):
+                    if match.start() != match.end():
+                        self.text.tag_add(tag, f"{line_num}.{col_base + match.start()}",
+                                          f"{line_num}.{col_base + match.end()}")
+
+    def _trim(self):
+        """
+        Drop the oldest lines once the scrollback limit is exceeded.
+        """
+        if not self.max_lines:
+            return
+        line_count = int(self.text.index("end-1c").split(".")[0])
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            # Lines moved up, so earlier undo steps would point at the wrong text
+            self.text.edit_reset()
@@ -0,0 +1,219 @@
+CONTROL_MASK = 0x0004
+
+
+def edit_lines(lines, first_line, selections, action, char=""):
+    """
+    Apply one keystroke to every selection.
+    lines holds the document lines starting at first_line, selections is a sorted list of
+    (line, start_col, end_col) where start_col == end_col is a plain caret.
+    action is "insert" (with char), "BackSpace" or "Delete".
+    Returns (new_lines, new_selections); only lines holding a selection are rebuilt.
+    """
+    new_lines = list(lines)
+    new_selections = []
+    k = 0
+    while k < len(selections):
+        line_num = selections[k][0]
+        source = lines[line_num - first_line]
+        pieces = []
+        length = 0
+        pos = 0
+        while k < len(selections) and selections[k][0] == line_num:
+            start = min(selections[k][1], len(source))
+            end = min(selections[k][2], len(source))
+            k += 1
+            if start < pos:
+                # Overlaps a selection that was already applied on this line
+                continue
+            if end > start:
+                keep, pos = source[pos:start], end
+            elif action == "BackSpace" and start > pos:
+                keep, pos = source[pos:start - 1], start
+            elif action == "Delete" and start < len(source):
+                keep, pos = source[pos:start], start + 1
+            else:
+                keep, pos = source[pos:start], start
+            pieces.append(keep)
+            length += len(keep)
+            if action == "insert":
+                pieces.append(char)
+                length += len(char)
+            if not new_selections or new_selections[-1] != (line_num, length, length):
+                new_selections.append((line_num, length, length))
+        pieces.append(source[pos:])
+        new_lines[line_num - first_line] = "".join(pieces)
+    return new_lines, new_selections
+
+
+def move_carets(lines, first_line, selections, keysym):
+    """
+    Move every caret for Left, Right, Home or End, collapsing selections.
+    """
+    moved = []
+    for line_num, start, end in selections:
+        length = len(lines[line_num - first_line])
+        if keysym == "Left":
+            col = start - 1 if start == end else start
+        elif keysym == "Right":
+            col = end + 1 if start == end else end
+        elif keysym == "Home":
+            col = 0
+        else:
+            col = length
+        col = max(0, min(col, length))
+        if not moved or moved[-1] != (line_num, col, col):
+            moved.append((line_num, col, col))
+    return moved
+
+
+# Multiple carets and rectangular (column) selections for a Text widget.
+# Every keystroke is computed against the document lines and committed as a single
+# widget update and a single undo step, however many carets there are.
+class MultiCursor:
+    BINDTAG = "MultiCursor"
+
+    def __init__(self, text):
+        self.text = text
+        self.selections = []  # Sorted (line, start_col, end_col)
+        self._anchor = None
+        text.tag_config("multi_caret", background="black", foreground="white")
+        text.tag_config("multi_selection", background="lightblue")
+        # Our bindings run before the widget's own ones so they can swallow keys
+        text.bindtags((self.BINDTAG,) + text.bindtags())
+        text.bind_class(self.BINDTAG, "<Key>", self._on_key)
+        text.bind_class(self.BINDTAG, "<Alt-Button-1>", self._on_alt_click)
+        text.bind_class(self.BINDTAG, "<Alt-B1-Motion>", self._on_alt_drag)
+        text.bind_class(self.BINDTAG, "<Button-1>", lambda event: self.clear())
+
+    def active(self):
+        return bool(self.selections)
+
+    def clear(self):
+        """
+        Drop all extra carets and selections.
+        """
+        self.selections = []
+        self._anchor = None
+        self._render()
+
+    def set_selections(self, selections):
+        self.selections = sorted(set(selections))
+        self._render()
+
+    def add_caret(self, index):
+        """
+        Add a caret at a Text index; the normal insert cursor becomes a caret too.
+        """
+        line, col = map(int, self.text.index(index).split("."))
+        carets = list(self.selections)
+        if not carets:
+            insert_line, insert_col = map(int, self.text.index("insert").split("."))
+            carets.append((insert_line, insert_col, insert_col))
+        carets.append((line, col, col))
+        self.set_selections(carets)
+
+    def carets_on_selected_lines(self):
+        """
+        Put a caret at the end of every line of the current selection.
+        """
+        try:
+            first = int(self.text.index("sel.first").split(".")[0])
+            last = int(self.text.index("sel.last").split(".")[0])
+        except Exception:
+            return
+        lines = self.text.get(f"{first}.0", f"{last}.0 lineend").split("\n")
+        self.text.tag_remove("sel", "1.0", "end")
+        self.set_selections([(first + i, len(line), len(line)) for i, line in enumerate(lines)])
+
+    def select_block(self, index1, index2):
+        """
+        Select the rectangle between two Text indexes, one selection per line.
+        """
+        line1, col1 = map(int, self.text.index(index1).split("."))
+        line2, col2 = map(int, self.text.index(index2).split("."))
+        top, bottom = min(line1, line2), max(line1, line2)
+        left, right = min(col1, col2), max(col1, col2)
+        self.set_selections([(line, left, right) for line in range(top, bottom + 1)])
+
+    def _on_alt_click(self, event):
+        self._anchor = self.text.index(f"@{event.x},{event.y}")
+        self.add_caret(self._anchor)
+        return "break"
+
+    def _on_alt_drag(self, event):
+        if self._anchor is not None:
+            self.select_block(self._anchor, f"@{event.x},{event.y}")
+        return "break"
+
+    def _on_key(self, event):
+        if not self.selections:
+            return None
+        keysym = event.keysym
+        if keysym == "Escape":
+            self.clear()
+        elif keysym in ("BackSpace", "Delete"):
+            self.apply(keysym)
+        elif keysym in ("Left", "Right", "Home", "End"):
+            first, last, lines = self._lines()
+            self.set_selections(move_carets(lines, first, self.selections, keysym))
+        elif event.char and event.char.isprintable() and not event.state & CONTROL_MASK:
+            self.apply("insert", event.char)
+        elif event.char or keysym in ("Return", "Tab", "Up", "Down", "Prior", "Next"):
+            # Anything else ends multi-caret editing and is handled normally
+            self.clear()
+            return None
+        else:
+            return None  # Modifier keys
+        return "break"
+
+    def _lines(self):
+        first = self.selections[0][0]
+        last = self.selections[-1][0]
+        lines = self.text.get(f"{first}.0", f"{last}.0 lineend").split("\n")
+        return first, last, lines
+
+    def apply(self, action, char=""):
+        """
+        Apply a keystroke to all carets with one widget update and one undo step.
+        """
+        first, last, lines = self._lines()
+        new_lines, self.selections = edit_lines(lines, first, self.selections, action, char)
+        # Only rewrite the span between the first and last line that actually changed
+        top = 0
+        while top < len(lines) and lines[top] == new_lines[top]:
+            top += 1
+        if top == len(lines):
+            self._render()
+            return
+        bottom = len(lines)
+        while lines[bottom - 1] == new_lines[bottom - 1]:
+            bottom -= 1
+        autoseparators = self.text.cget("autoseparators")
+        self.text.config(autoseparators=False)
+        self.text.edit_separator()
+        self.text.replace(f"{first + top}.0", f"{first + bottom - 1}.0 lineend",
+                          "\n".join(new_lines[top:bottom]))
+        self.text.edit_separator()
+        self.text.config(autoseparators=autoseparators)
+        self._render()
+
+    def _render(self):
+        """
+        Redraw all carets and selections with one tag call each.
+        """
+        self.text.tag_remove("multi_caret", "1.0", "end")
+        self.text.tag_remove("multi_selection", "1.0", "end")
+        carets = []
+        selected = []
+        for line, start, end in self.selections:
+            if start == end:
+                carets += [f"{line}.{start}", f"{line}.{start + 1}"]
+            else:
+                selected += [f"{line}.{start}", f"{line}.{end}"]
+        if carets:
+            self.text.tag_add("multi_caret", *carets)
+        if selected:
+            self.text.tag_add("multi_selection", *selected)
+        if self.selections:
+            line, start, _ = self.selections[-1]
+            self.text.mark_set("insert", f"{line}.{start}")
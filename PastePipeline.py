@@ -0,0 +1,107 @@
+import re
+
+NEWLINE_RE = re.compile(r"\r\n?")
+
+
+def normalize_newlines(data):
+    """
+    Turn Windows and old Mac line endings into newlines in one pass.
+    """
+    return NEWLINE_RE.sub("\n", data)
+
+
+def split_chunks(data, size):
+    """
+    Split text into pieces of about size characters, cut after a newline where possible.
+    """
+    start = 0
+    while start < len(data):
+        end = start + size
+        if end < len(data):
+            newline = data.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        yield data[start:end]
+        start = end
+
+
+# Pastes into a Text widget. Large pastes are inserted in chunks from idle callbacks,
+# so the window keeps redrawing and reports progress, and the whole paste is one undo step.
+# Editing while a paste is in progress stops it, so the edit never lands inside the paste.
+class PastePipeline:
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, text, on_progress=None, on_done=None):
+        self.text = text
+        self.on_progress = on_progress  # Called with (inserted characters, total characters)
+        self.on_done = on_done
+        self.active = False
+        self._chunks = None
+        self._inserted = 0
+        self._total = 0
+        self._autoseparators = True
+        text.mark_set("paste_end", "insert")
+        text.mark_gravity("paste_end", "right")
+        # Our bindings run before the widget's own ones, so the paste stops before a key is handled
+        tag = f"PastePipeline{id(self)}"
+        text.bindtags((tag,) + text.bindtags())
+        text.bind_class(tag, "<Key>", self._on_key)
+        text.bind_class(tag, "<<PasteSelection>>", lambda event: self.cancel())
+
+    def paste(self, data):
+        """
+        Replace the selection (if any) with data.
+        """
+        if self.active:
+            return
+        data = normalize_newlines(data)
+        self._autoseparators = self.text.cget("autoseparators")
+        self.text.config(autoseparators=False)
+        self.text.edit_separator()
+        if self.text.tag_ranges("sel"):
+            self.text.delete("sel.first", "sel.last")
+        self.text.mark_set("paste_end", "insert")
+        if len(data) <= self.CHUNK_SIZE:
+            self.text.insert("paste_end", data)
+            self._finish()
+            return
+        self.active = True
+        self._chunks = split_chunks(data, self.CHUNK_SIZE)
+        self._inserted = 0
+        self._total = len(data)
+        self.text.after_idle(self._insert_next)
+
+    def _insert_next(self):
+        if not self.active:
+            return
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._finish()
+            return
+        self.text.insert("paste_end", chunk)
+        self._inserted += len(chunk)
+        if self.on_progress:
+            self.on_progress(self._inserted, self._total)
+        self.text.after_idle(self._insert_next)
+
+    def _on_key(self, event):
+        # The key then goes in after what was pasted so far, as an undo step of its own
+        if event.char or event.keysym in ("BackSpace", "Delete"):
+            self.cancel()
+
+    def cancel(self):
+        """
+        Stop a paste in progress, keeping what was inserted so far.
+        """
+        if self.active:
+            self._finish()
+
+    def _finish(self):
+        self.active = False
+        self._chunks = None
+        self.text.edit_separator()
+        self.text.config(autoseparators=self._autoseparators)
+        self.text.mark_set("insert", "paste_end")
+        self.text.see("insert")
+        if self.on_done:
+            self.on_done()
@@ -0,0 +1,133 @@
+import re
+
+NUMBER_PREFIX_RE = re.compile(r"\d+\. ")
+TCL_SPECIAL_RE = re.compile(r'([\\\[\]$"{}])')
+
+
+# Each transform returns per-line edits (line, start_col, end_col, replacement) for the
+# lines of a selection; lines is the selected text split on newlines, starting at first_line.
+
+def indent_edits(lines, first_line, unit="    "):
+    """
+    Indent every non-blank line by one unit.
+    """
+    return [(line_num, 0, 0, unit) for line_num, line in enumerate(lines, first_line) if line.strip()]
+
+
+def unindent_edits(lines, first_line, width=4):
+    """
+    Remove one level of indentation (a tab or up to width spaces) from every line.
+    """
+    edits = []
+    for line_num, line in enumerate(lines, first_line):
+        if line.startswith("\t"):
+            edits.append((line_num, 0, 1, ""))
+            continue
+        spaces = len(line[:width]) - len(line[:width].lstrip(" "))
+        if spaces:
+            edits.append((line_num, 0, spaces, ""))
+    return edits
+
+
+def comment_edits(lines, first_line, prefix="# "):
+    """
+    Comment out the lines at their common indentation, or uncomment them if they are all commented.
+    """
+    marker = prefix.rstrip()
+    code_lines = [(line_num, line) for line_num, line in enumerate(lines, first_line) if line.strip()]
+    if not code_lines:
+        return []
+    if all(line.lstrip().startswith(marker) for _, line in code_lines):
+        edits = []
+        for line_num, line in code_lines:
+            start = len(line) - len(line.lstrip())
+            end = start + (len(prefix) if line[start:].startswith(prefix) else len(marker))
+            edits.append((line_num, start, end, ""))
+        return edits
+    column = min(len(line) - len(line.lstrip()) for _, line in code_lines)
+    return [(line_num, column, column, prefix) for line_num, _ in code_lines]
+
+
+def numbered_list_edits(lines, first_line):
+    """
+    Number the lines 1., 2., ...; existing numbers are replaced, so this also renumbers a list.
+    """
+    edits = []
+    for number, (line_num, line) in enumerate(enumerate(lines, first_line), 1):
+        match = NUMBER_PREFIX_RE.match(line)
+        edits.append((line_num, 0, match.end() if match else 0, f"{number}. "))
+    return edits
+
+
+def bulleted_list_edits(lines, first_line, bullet="- "):
+    """
+    Prefix every line with a bullet, skipping lines that already have one.
+    """
+    return [(line_num, 0, 0, bullet) for line_num, line in enumerate(lines, first_line)
+            if not line.startswith(bullet)]
+
+
+def apply_line_edits(lines, first_line, edits):
+    """
+    Apply per-line edits to a list of lines (no widget needed) and return the new lines.
+    """
+    new_lines = list(lines)
+    for line_num, start, end, replacement in sorted(edits, reverse=True):
+        line = new_lines[line_num - first_line]
+        new_lines[line_num - first_line] = line[:start] + replacement + line[end:]
+    return new_lines
+
+
+def _tcl_quote(value):
+    return '"' + TCL_SPECIAL_RE.sub(r"\\\1", value) + '"'
+
+
+def apply_edits(text, edits):
+    """
+    Apply per-line edits to a Text widget bottom-up, so earlier positions stay valid,
+    as one Tcl script (no Python round-trip per line) and one undo step.
+    Only the edited characters change, so marks and tags elsewhere are preserved.
+    """
+    if not edits:
+        return
+    widget = str(text)
+    script = []
+    for line_num, start, end, replacement in sorted(edits, reverse=True):
+        if end > start:
+            script.append(f"{widget} delete {line_num}.{start} {line_num}.{end}")
+        if replacement:
+            script.append(f"{widget} insert {line_num}.{start} {_tcl_quote(replacement)}")
+    autoseparators = text.cget("autoseparators")
+    text.config(autoseparators=False)
+    text.edit_separator()
+    text.tk.eval("\n".join(script))
+    text.edit_separator()
+    text.config(autoseparators=autoseparators)
+
+
+def selected_lines(text):
+    """
+    Return (first_line, lines) covering the selection, or the insert line without one.
+    A selection ending at the start of a line does not include that line.
+    """
+    try:
+        first = int(text.index("sel.first").split(".")[0])
+        last_line, last_col = map(int, text.index("sel.last").split("."))
+        if last_col == 0 and last_line > first:
+            last_line -= 1
+    except Exception:
+        first = last_line = int(text.index("insert").split(".")[0])
+    return first, text.get(f"{first}.0", f"{last_line}.0 lineend").split("\n")
+
+
+def transform_selection(text, make_edits, *args):
+    """
+    Run a transform over the selected lines and keep those lines selected afterwards.
+    """
+    had_selection = bool(text.tag_ranges("sel"))
+    first, lines = selected_lines(text)
+    apply_edits(text, make_edits(lines, first, *args))
+    if had_selection:
+        last = first + len(lines) - 1
+        text.tag_remove("sel", "1.0", "end")
+        text.tag_add("sel", f"{first}.0", f"{last}.0 lineend")
@@ -0,0 +1,141 @@
+import re
+import threading
+from textblob import Word
+from LRUCache import LRUCache
+
+WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+
+
+# Background spell checker that only tags misspellings inside the visible part of a Text widget
+class SpellChecker:
+    DELAY_MS = 250  # Wait for typing to pause before re-checking
+    POLL_MS = 100  # How often to look for finished results while the worker is busy
+
+    def __init__(self, text, word_cache_size=50000, paragraph_cache_size=5000):
+        self.text = text
+        self.words = LRUCache(word_cache_size)  # word -> True if spelled correctly
+        # Paragraph (logical line) text -> list of (start, end, tag) spans.
+        # Keyed by content, so edited paragraphs are simply new keys and everything else is reused.
+        self.paragraphs = LRUCache(paragraph_cache_size)
+        self.enabled = False
+        self._after_id = None
+        self._pending = None
+        self._wakeup = threading.Condition()
+        self._results_ready = False
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+        text.tag_config("misspelled", foreground="red", underline=True)
+        text.tag_config("grammar", foreground="blue", underline=True)
+
+    def enable(self):
+        """
+        Start checking the visible text.
+        """
+        self.enabled = True
+        self.schedule()
+
+    def disable(self):
+        """
+        Stop checking and remove all marks.
+        """
+        self.enabled = False
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+        self.text.tag_remove("misspelled", "1.0", "end")
+        self.text.tag_remove("grammar", "1.0", "end")
+
+    def schedule(self, event=None):
+        """
+        Re-check the viewport once the user pauses (call after edits and scrolling).
+        """
+        if not self.enabled:
+            return
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+        self._after_id = self.text.after(self.DELAY_MS, self._refresh)
+
+    def _visible_lines(self):
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return first, last
+
+    def _refresh(self):
+        """
+        Tag cached results for the visible paragraphs and hand the unchecked ones to the worker.
+        """
+        self._after_id = None
+        first, last = self._visible_lines()
+        lines = self.text.get(f"{first}.0", f"{last}.0 lineend").split("\n")
+        ranges = {"misspelled": [], "grammar": []}
+        unchecked = []
+        for line_num, line in enumerate(lines, first):
+            spans = self.paragraphs.get(line)
+            if spans is None:
+                unchecked.append(line)
+                continue
+            for start, end, tag in spans:
+                ranges[tag] += [f"{line_num}.{start}", f"{line_num}.{end}"]
+        for tag, indexes in ranges.items():
+            self.text.tag_remove(tag, f"{first}.0", f"{last}.0 lineend")
+            if indexes:
+                self.text.tag_add(tag, *indexes)
+        if unchecked:
+            with self._wakeup:
+                # Only the latest viewport matters; stale requests are replaced
+                self._pending = unchecked
+                self._wakeup.notify()
+            self._after_id = self.text.after(self.POLL_MS, self._poll_results)
+
+    def _poll_results(self):
+        self._after_id = None
+        if self._results_ready:
+            self._results_ready = False
+            self._refresh()
+        elif self.enabled:
+            self._after_id = self.text.after(self.POLL_MS, self._poll_results)
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                while self._pending is None:
+                    self._wakeup.wait()
+                lines = self._pending
+                self._pending = None
+            for line in lines:
+                if line not in self.paragraphs:
+                    self.paragraphs.put(line, self.check_paragraph(line))
+            self._results_ready = True
+
+    def check_paragraph(self, paragraph):
+        """
+        Return (start, end, tag) spans for misspelled and doubled words in a paragraph.
+        """
+        spans = []
+        previous = None
+        for match in WORD_RE.finditer(paragraph):
+            word = match.group()
+            lowered = word.lower()
+            if previous is not None and lowered == previous[0] \
+                    and paragraph[previous[1]:match.start()].isspace():
+                spans.append((match.start(), match.end(), "grammar"))
+            elif not self.is_correct(word):
+                spans.append((match.start(), match.end(), "misspelled"))
+            previous = (lowered, match.end())
+        return spans
+
+    def is_correct(self, word):
+        """
+        Check a single word against TextBlob's dictionary, caching the verdict.
+        """
+        # Skip single letters and acronyms
+        if len(word) < 2 or word.isupper():
+            return True
+        lowered = word.lower()
+        verdict = self.words.get(lowered)
+        if verdict is None:
+            suggestions = Word(lowered).spellcheck()
+            # Known words come back as the only candidate with full confidence
+            verdict = bool(suggestions) and suggestions[0][0] == lowered and suggestions[0][1] > 0
+            self.words.put(lowered, verdict)
+        return verdict
@@ -0,0 +1,162 @@
+import hashlib
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import jedi
+from pygments.lexers import get_lexer_by_name
+from pygments.token import Name
+from pygments.util import ClassNotFound
+from LRUCache import LRUCache
+
+Symbol = namedtuple("Symbol", "name kind line column depth")
+CHUNK_LINES = 200  # Chunks are cut at the first top-level line after this many lines
+
+
+def _with_depth(found, code):
+    """
+    Sort (name, kind, line, column) definitions and nest them by the indentation of their line.
+    """
+    lines = code.split("\n")
+    symbols = []
+    open_indents = []
+    for name, kind, line, column in sorted(found, key=lambda item: (item[2], item[3])):
+        text = lines[line - 1]
+        indent = len(text) - len(text.lstrip())
+        while open_indents and open_indents[-1] >= indent:
+            open_indents.pop()
+        symbols.append(Symbol(name, kind, line, column, len(open_indents)))
+        if kind in ("class", "function"):
+            open_indents.append(indent)
+    return symbols
+
+
+def split_chunks(code):
+    """
+    Split code into (first line number, text) chunks that start at top-level lines,
+    so an edit only invalidates the chunk it is in.
+    """
+    # Split on newlines only, like Tk, Jedi and Pygments; splitlines() also breaks at form feeds
+    lines = code.split("\n")
+    lines = [line + "\n" for line in lines[:-1]] + ([lines[-1]] if lines[-1] else [])
+    start = 0
+    for i in range(len(lines)):
+        line = lines[i]
+        if i - start >= CHUNK_LINES and line.strip() and line[0] not in " \t)]}#":
+            yield start + 1, "".join(lines[start:i])
+            start = i
+    if start < len(lines) or not lines:
+        yield start + 1, "".join(lines[start:])
+
+
+def python_symbols(code):
+    """
+    Collect definitions in Python code with Jedi.
+    """
+    found = []
+    for name in jedi.Script(code).get_names(all_scopes=True, definitions=True, references=False):
+        if name.type in ("class", "function"):
+            found.append((name.name, name.type, name.line, name.column))
+        elif name.type == "statement" and name.column == 0:
+            found.append((name.name, "variable", name.line, name.column))
+    return _with_depth(found, code)
+
+
+def token_symbols(code, language):
+    """
+    Collect function and class names from a Pygments token scan, for languages Jedi does not handle.
+    """
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        return []
+    line_starts = [0] + [match.end() for match in re.finditer("\n", code)]
+    found = []
+    for offset, ttype, value in lexer.get_tokens_unprocessed(code):
+        if ttype in Name.Function:
+            kind = "function"
+        elif ttype in Name.Class:
+            kind = "class"
+        else:
+            continue
+        line = bisect_right(line_starts, offset)
+        found.append((value, kind, line, offset - line_starts[line - 1]))
+    return _with_depth(found, code)
+
+
+# Index of the symbols defined in a buffer, built on a worker thread and cached by content hash
+class SymbolIndex:
+    def __init__(self, cache_size=4096):
+        self._cache = LRUCache(cache_size)  # (language, sha1 of a chunk) -> symbols relative to the chunk
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.symbols = []
+        self.definitions = {}  # name -> symbols with that name
+        self.key = None
+
+    @staticmethod
+    def key_for(code, language):
+        return (language, hashlib.sha1(code.encode("utf-8", "surrogatepass")).hexdigest())
+
+    def is_current(self, code, language):
+        """
+        Return True if the index already describes this version of the code.
+        """
+        return self.key == self.key_for(code, language)
+
+    def _chunk_symbols(self, chunk, language):
+        """
+        Return the symbols of one chunk, only scanning it if this exact text was not seen before.
+        """
+        key = self.key_for(chunk, language)
+        symbols = self._cache.get(key)
+        if symbols is None:
+            symbols = []
+            if language == "python":
+                try:
+                    symbols = python_symbols(chunk)
+                except Exception as e:
+                    print(f"Error indexing with Jedi: {e}")
+            if not symbols:
+                symbols = token_symbols(chunk, language)
+            self._cache.put(key, symbols)
+        return symbols
+
+    def build(self, code, language):
+        """
+        Return (key, symbols) for the code. Only chunks that changed since they were
+        last indexed are scanned again. Safe to call from the worker thread.
+        """
+        symbols = []
+        for first_line, chunk in split_chunks(code):
+            symbols += [symbol._replace(line=symbol.line + first_line - 1)
+                        for symbol in self._chunk_symbols(chunk, language)]
+        return self.key_for(code, language), symbols
+
+    def submit(self, code, language):
+        """
+        Build the index in the background. Returns a future; call apply() with its result on the UI thread.
+        """
+        return self._executor.submit(self.build, code, language)
+
+    def apply(self, result):
+        """
+        Make a finished build the current index.
+        """
+        self.key, self.symbols = result
+        self.definitions = {}
+        for symbol in self.symbols:
+            self.definitions.setdefault(symbol.name, []).append(symbol)
+
+    def find_definition(self, name, line=None):
+        """
+        Return the best definition of a name: classes and functions first,
+        then the closest definition above the given line.
+        """
+        candidates = self.definitions.get(name)
+        if not candidates:
+            return None
+        if line is not None:
+            above = [symbol for symbol in candidates if symbol.line <= line]
+            if above:
+                candidates = above
+        return max(candidates, key=lambda symbol: (symbol.kind != "variable", symbol.line))
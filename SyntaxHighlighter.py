@@ -0,0 +1,143 @@
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pygments.lexers import get_lexer_by_name
+from pygments.styles import get_style_by_name
+from pygments.token import Comment, String, Whitespace, Text as PlainText
+from pygments.util import ClassNotFound
+
+
+def scan_checkpoints(code, lexer, every=200):
+    """
+    Lex the whole document once and return the line numbers, roughly every `every` lines,
+    where a token starts at column 0 outside any string or comment. Lexing can restart
+    from such a line with a fresh lexer and produce the same tokens.
+    """
+    checkpoints = [1]
+    line = 1
+    at_line_start = True
+    target = every
+    for _, ttype, value in lexer.get_tokens_unprocessed(code):
+        if at_line_start and line >= target and value.strip() \
+                and ttype not in String and ttype not in Comment:
+            checkpoints.append(line)
+            target = line + every
+        newlines = value.count("\n")
+        line += newlines
+        at_line_start = value.endswith("\n")
+    return checkpoints
+
+
+# Highlights code in a Text widget with Pygments, only lexing from the closest checkpoint
+# above the visible lines and only tagging the visible lines
+class SyntaxHighlighter:
+    DELAY_MS = 50
+    FALLBACK_LINES = 1000  # How far back to look for a top-level line when no checkpoint is close
+
+    def __init__(self, text, style="default"):
+        self.text = text
+        self.lexer = None
+        self.language = "text"
+        self.checkpoints = [1]
+        self.suspended = False  # Set while large edits are in progress
+        self._after_id = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._tags = set()
+        self._style = get_style_by_name(style)
+
+    def set_language(self, language, checkpoints=None):
+        """
+        Switch lexer. Known checkpoints (e.g. from the file state cache) skip the full scan.
+        """
+        self.clear()
+        self.language = language
+        try:
+            self.lexer = None if language == "text" else get_lexer_by_name(language)
+        except ClassNotFound:
+            self.lexer = None
+        self.checkpoints = list(checkpoints) if checkpoints else [1]
+        if self.lexer is not None and not checkpoints:
+            self.rescan()
+        self.schedule()
+
+    def rescan(self):
+        """
+        Recompute the checkpoints on a worker thread.
+        """
+        lexer = self.lexer
+        future = self._executor.submit(scan_checkpoints, self.text.get("1.0", "end-1c"), lexer)
+
+        def check_done():
+            if not future.done():
+                self.text.after(100, check_done)
+            elif lexer is self.lexer:
+                self.checkpoints = future.result()
+        self.text.after(100, check_done)
+
+    def clear(self):
+        for tag in self._tags:
+            self.text.tag_remove(tag, "1.0", "end")
+
+    def schedule(self, event=None):
+        """
+        Re-highlight the visible lines shortly (call after edits and scrolling).
+        """
+        if self.lexer is None or self.suspended:
+            return
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+        self._after_id = self.text.after(self.DELAY_MS, self.highlight_visible)
+
+    def _tag_for(self, ttype):
+        """
+        Return the Tk tag for a token type, creating it from the Pygments style on first use.
+        """
+        while ttype not in self._style.styles and ttype.parent is not None:
+            ttype = ttype.parent
+        tag = str(ttype)
+        if tag not in self._tags:
+            color = self._style.style_for_token(ttype)["color"]
+            self.text.tag_config(tag, foreground=f"#{color}" if color else "")
+            self.text.tag_lower(tag)  # Selection and other marks stay on top
+            self._tags.add(tag)
+        return tag
+
+    def start_line(self, first):
+        """
+        Return a line at or above `first` from which lexing can start.
+        """
+        candidate = self.checkpoints[bisect_right(self.checkpoints, first) - 1]
+        # Checkpoints drift with edits, so make sure it is still a top-level line
+        if first - candidate <= self.FALLBACK_LINES and self.text.get(f"{candidate}.0") not in " \t\n":
+            return candidate
+        found = self.text.search(r"^\S", f"{first}.0", backwards=True, regexp=True,
+                                 stopindex=f"{max(1, first - self.FALLBACK_LINES)}.0")
+        return int(found.split(".")[0]) if found else max(1, first - self.FALLBACK_LINES)
+
+    def highlight_visible(self):
+        """
+        Lex from the nearest checkpoint and tag the tokens on the visible lines.
+        """
+        self._after_id = None
+        if self.lexer is None:
+            return
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        start = self.start_line(first)
+        code = self.text.get(f"{start}.0", f"{last}.0 lineend")
+        ranges = {}
+        line = start
+        col = 0
+        for _, ttype, value in self.lexer.get_tokens_unprocessed(code):
+            if line > last:
+                break
+            newlines = value.count("\n")
+            end_line = line + newlines
+            end_col = len(value) - value.rfind("\n") - 1 if newlines else col + len(value)
+            if end_line >= first and ttype not in PlainText and ttype not in Whitespace:
+                ranges.setdefault(self._tag_for(ttype), []).extend(
+                    (f"{line}.{col}", f"{end_line}.{end_col}"))
+            line, col = end_line, end_col
+        for tag in self._tags:
+            self.text.tag_remove(tag, f"{first}.0", f"{last}.0 lineend")
+        for tag, indexes in ranges.items():
+            self.text.tag_add(tag, *indexes)
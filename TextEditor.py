@@ -9,6 +9,7 @@ from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 import jedi
 import langid
+from DiffEngine import to_disk_bytes, write_minimal
 
 # Custom TextEditor class inheriting from tkinter's Text widget
 class TextEditor(Text):
@@ -18,6 +19,7 @@ class TextEditor(Text):
         self._orig = ""
         self._undo_stack = []  # Stack to manage undo operations
         self._redo_stack = []  # Stack to manage redo operations
+        self._saved = (None, None)  # (filename, bytes) last written by save
         self._setup_bindings()
 
     def _setup_bindings(self):
@@ -65,7 +67,11 @@ class TextEditor(Text):
         global filename
         if filename:
             all_text = self.get(1.0, END)
-            open(filename, "w").write(all_text)
+            new_bytes = to_disk_bytes(all_text)
+            saved_name, saved_bytes = self._saved
+            # Appends and same-length edits only touch the changed bytes on disk
+            write_minimal(filename, saved_bytes if saved_name == filename else None, new_bytes)
+            self._saved = (filename, new_bytes)
 
     def find_and_replace(self, event=None):
         """
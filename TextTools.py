@@ -0,0 +1,83 @@
+import re
+import string
+from collections import Counter
+from SelectionTransform import apply_line_edits, numbered_list_edits, bulleted_list_edits
+
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+# Document transforms that need no window, shared by the editor, the AI commands and batch mode
+
+
+def preprocess(text):
+    """
+    Preprocess the input text by making it lowercase and removing punctuation.
+    """
+    return text.lower().translate(PUNCTUATION_TABLE).split()
+
+
+def decode_text(data):
+    """
+    Decode file contents as UTF-8, falling back to Latin-1; returns (text, encoding).
+    Windows line endings become newlines.
+    """
+    for encoding in ("utf-8", "latin-1"):
+        try:
+            return data.decode(encoding).replace("\r\n", "\n"), encoding
+        except UnicodeDecodeError:
+            continue
+
+
+def newline_style(data):
+    """
+    Return the line ending most lines of the file contents use, "\r\n" or "\n".
+    """
+    crlf = data.count(b"\r\n")
+    return "\r\n" if crlf and crlf * 2 >= data.count(b"\n") else "\n"
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def character_count(text):
+    return len(text)
+
+
+def extract_keywords(text, count=5):
+    """
+    Return the most common words of the text.
+    """
+    return [word for word, _ in Counter(preprocess(text)).most_common(count)]
+
+
+def replace_text(text, find, replacement, match_case=True, regex=False):
+    """
+    Replace every occurrence of find; returns (new text, number of replacements).
+    """
+    pattern = find if regex else re.escape(find)
+    if not regex:
+        replacement = replacement.replace("\\", "\\\\")
+    return re.subn(pattern, replacement, text, flags=0 if match_case else re.IGNORECASE)
+
+
+def change_case(text, mode):
+    """
+    Convert the text to "upper", "lower" or "title" case.
+    """
+    if mode == "upper":
+        return text.upper()
+    elif mode == "lower":
+        return text.lower()
+    elif mode == "title":
+        return text.title()
+    raise ValueError(f"Unknown case: {mode}")
+
+
+def make_list(text, style):
+    """
+    Turn every line into a "numbered" or "bulleted" list item.
+    """
+    body = text[:-1] if text.endswith("\n") else text
+    lines = body.split("\n")
+    edits = numbered_list_edits(lines, 1) if style == "numbered" else bulleted_list_edits(lines, 1)
+    return "\n".join(apply_line_edits(lines, 1, edits)) + text[len(body):]
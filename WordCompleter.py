@@ -0,0 +1,212 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from heapq import nsmallest
+from TextTools import preprocess
+
+TOP_K = 10  # Completions cached per trie node
+
+
+def _rank(entry):
+    return -entry[0], entry[1]  # Most frequent first, ties in alphabetical order
+MAX_CHARS = 4 * 1024 * 1024  # Larger documents get no prose completion
+
+
+# Node of the prefix trie; top caches the TOP_K most frequent words below it
+class _Node:
+    __slots__ = ("children", "count", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+        self.top = None  # Sorted [(count, word)], most frequent first, or None until asked for
+
+
+# Prefix trie of words ranked by frequency. The best completions of a prefix are cached
+# in its node and kept up to date as counts go up, so repeated queries are a walk down
+# the trie plus a slice.
+class PrefixTrie:
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, word, delta=1):
+        """
+        Change the count of a word by delta (negative to remove occurrences).
+        """
+        path = [self.root]
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                if delta <= 0:
+                    return
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        node.count = max(0, node.count + delta)
+        count = node.count
+        for visited in path:
+            if visited.top is None:
+                continue
+            if delta < 0:
+                # A word that drops could be overtaken by one not in the list
+                visited.top = None
+                continue
+            entries = [entry for entry in visited.top if entry[1] != word]
+            if len(entries) < len(visited.top) or len(entries) < TOP_K or _rank((count, word)) < _rank(entries[-1]):
+                entries.append((count, word))
+                entries.sort(key=_rank)
+                del entries[TOP_K:]
+            visited.top = entries
+        if count == 0:
+            self._prune(word)
+
+    def _prune(self, word):
+        """
+        Drop nodes left without words after a removal.
+        """
+        path = [self.root]
+        for char in word:
+            path.append(path[-1].children[char])
+        for depth in range(len(word), 0, -1):
+            node = path[depth]
+            if node.count or node.children:
+                break
+            del path[depth - 1].children[word[depth - 1]]
+
+    def _node(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _collect(self, node, prefix):
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.count:
+                yield node.count, word
+            for char, child in node.children.items():
+                stack.append((child, word + char))
+
+    def complete(self, prefix, k=5):
+        """
+        Return up to k words starting with prefix, most frequent first.
+        """
+        node = self._node(prefix)
+        if node is None:
+            return []
+        if node.top is None:
+            node.top = nsmallest(TOP_K, self._collect(node, prefix), key=_rank)
+        return [word for _, word in node.top[:k]]
+
+
+# Vocabulary of a document for prose completion. It is only built once completion is first
+# needed, on a worker thread, and then follows the edits reported by an EditObserver.
+# Documents larger than MAX_CHARS get no prose completion.
+class WordCompleter:
+    def __init__(self, observer=None):
+        self.observer = observer
+        self.trie = PrefixTrie()
+        self.state = None  # None until first used, then "loading", "ready" or "too large"
+        self.size = 0  # Characters in the document
+        self._pending = []  # Edits made while loading, as (old text, new text)
+        self._future = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    @staticmethod
+    def build(text):
+        """
+        Return a trie of the words of a document (safe to call from the worker thread).
+        """
+        trie = PrefixTrie()
+        for word, count in Counter(preprocess(text)).items():
+            trie.add(word, count)
+        return trie
+
+    def _count(self, text, delta):
+        for word, count in Counter(preprocess(text)).items():
+            self.trie.add(word, delta * count)
+
+    def _follow(self, following):
+        if self.observer is None:
+            return
+        if following and self.edited not in self.observer.listeners:
+            self.observer.add_listener(self.edited)
+        elif not following and self.edited in self.observer.listeners:
+            self.observer.remove_listener(self.edited)
+
+    def reset(self):
+        """
+        Forget the vocabulary, e.g. before another document is loaded; it is built again on next use.
+        """
+        self._follow(False)
+        self.trie = PrefixTrie()
+        self.state = None
+        self.size = 0
+        self._pending = []
+        self._future = None
+
+    def start(self, text):
+        """
+        Start indexing a document in the background, unless it is too large.
+        """
+        self.reset()
+        if len(text) > MAX_CHARS:
+            self.state = "too large"
+            return
+        self.state = "loading"
+        self.size = len(text)
+        self._future = self._executor.submit(self.build, text)
+        self._follow(True)
+
+    def loading(self):
+        """
+        Return True while the vocabulary is being built. Call on the UI thread: once the
+        build is done, this makes it current and applies the edits made in the meantime.
+        """
+        if self.state != "loading":
+            return False
+        if not self._future.done():
+            return True
+        try:
+            self.trie = self._future.result()
+        except Exception as e:
+            print(f"Error building word completions: {e}")
+            self.reset()
+            return False
+        self._future = None
+        self.state = "ready"
+        for old, new in self._pending:
+            self._count(old, -1)
+            self._count(new, 1)
+        self._pending = []
+        return False
+
+    def edited(self, first_line, old, new):
+        """
+        Follow an edit that replaced the text old of some whole lines with new.
+        """
+        self.size += len(new) - len(old)
+        if self.size > MAX_CHARS:
+            self.reset()
+            self.state = "too large"
+        elif self.state == "loading":
+            self._pending.append((old, new))
+        elif self.state == "ready":
+            self._count(old, -1)
+            self._count(new, 1)
+
+    def complete(self, prefix, k=5):
+        """
+        Return completions for a word prefix, in the prefix's case, leaving out the prefix itself.
+        Nothing is returned until the vocabulary is ready.
+        """
+        if self.state != "ready":
+            return []
+        words = self.trie.complete(prefix.lower(), k + 1)
+        words = [word for word in words if word != prefix.lower()][:k]
+        if prefix[:1].isupper():
+            words = [word.upper() if prefix.isupper() and len(prefix) > 1 else word.capitalize() for word in words]
+        return words
@@ -6,30 +6,71 @@ import os
 import sys
 import time
 from pygments import highlight
-from pygments.lexers import get_lexer_by_name
+from pygments.lexers import get_lexer_by_name, get_lexer_for_filename
+from pygments.util import ClassNotFound
 from pygments.formatters import HtmlFormatter
 import jedi
 import langid
 import requests
 import json
-import string
 from textblob import TextBlob
-from collections import Counter
 import random
+from FileWatcher import FileWatcher
+from LogTail import LogTail
+from DiffEngine import Snapshot, diff_lines, to_disk_bytes, write_minimal
+from DiffView import DiffView
+from SpellChecker import SpellChecker
+from SymbolIndex import SymbolIndex
+from MultiCursor import MultiCursor
+from FoldIndex import FoldIndex
+from SyntaxHighlighter import SyntaxHighlighter
+from CommandRegistry import CommandRegistry
+from ChatHistory import ChatHistory
+from ChatView import ChatView
+from Exporter import Exporter, FORMATS
+from PastePipeline import PastePipeline
+from CompactStorage import memory_usage
+from IncrementalSearch import IncrementalSearch
+from WordCompleter import WordCompleter
+from EditObserver import EditObserver
+from CompletionPopup import CompletionPopup
+from concurrent.futures import ThreadPoolExecutor
+from TextTools import preprocess, decode_text, extract_keywords
+from FileStateCache import FileStateCache, newline_index
+from SelectionTransform import (transform_selection, indent_edits, unindent_edits, comment_edits,
+                                numbered_list_edits, bulleted_list_edits)
 
 # Class for advanced AI functionalities
 class AdvancedAI:
     def __init__(self):
-        self.conversation_history = []
+        self.conversation_history = ChatHistory()
+        self.commands = CommandRegistry(fallback=self.default_response)
+        self.commands.register("word_count", [r"word\s+count"], "Word count: Get the current word count",
+                               plugin="AICommands:word_count")
+        self.commands.register("character_count", [r"char(?:acter)?\s+count"],
+                               "Character count: Get the current character count", plugin="AICommands:character_count")
+        # Changing the case rewrites the whole document too, so it needs an order like "uppercase",
+        # "please convert the text to upper case" or "make everything lowercase"
+        case_order = (r"^(?:please\s+)?(?:(?:convert|make|change|turn)(?:\s+(?:all|the|this|everything|text|document))*"
+                      r"(?:\s+(?:to|in|into))?\s+)?{}(?:\s+(?:all|the|this|everything|text|document))*(?=[\s.!]*$)")
+        self.commands.register("uppercase", [case_order.format(r"upper\s*case")], "Uppercase: Convert text to uppercase",
+                               plugin="AICommands:uppercase")
+        self.commands.register("lowercase", [case_order.format(r"lower\s*case")], "Lowercase: Convert text to lowercase",
+                               plugin="AICommands:lowercase")
+        # Clearing wipes the document, so only an order like "clear" or "please clear all text" counts,
+        # never a message that merely mentions the word
+        self.commands.register("clear", [r"^(?:please\s+)?clear(?:\s+(?:all|the|this|everything|text|document|screen))*(?=[\s.!]*$)"],
+                               "Clear: Clear all text", plugin="AICommands:clear")
+        self.commands.register("sentiment", [r"sentiment"], "Sentiment: Analyze the sentiment of the text",
+                               plugin="AICommands:sentiment")
+        self.commands.register("keywords", [r"key\s*words?"], "Keywords: Extract top keywords from the text",
+                               plugin="AICommands:keywords")
 
     def preprocess(self, text):
         """
         Preprocess the input text by making it lowercase and removing punctuation.
         """
-        text = text.lower()
-        text = ''.join([char for char in text if char not in string.punctuation])
-        tokens = text.split()
-        return tokens
+        return preprocess(text)
 
     def analyze_sentiment(self, text):
         """
@@ -45,41 +86,20 @@ class AdvancedAI:
         Extract keywords from the text.
         Returns the top 5 common words.
         """
-        tokens = self.preprocess(text)
-        counter = Counter(tokens)
-        most_common = counter.most_common(5)
-        keywords = [word for word, freq in most_common]
-        return keywords
+        return extract_keywords(text)
 
-    def generate_response(self, user_input):
+    def generate_response(self, user_input, current_text):
         """
-        Generate a response based on user input.
-        Handles various text commands for word count, character count,
-        text transformation, sentiment analysis, and keyword extraction.
+        Generate a response based on user input by dispatching it to the command registry.
+        Returns the reply and the new document text, or None if the command left it alone.
+        """
+        reply, new_text, _ = self.commands.run(user_input, current_text)
+        return reply, new_text
+
+    def default_response(self, user_input):
+        """
+        Default response for unrecognized input.
         """
-        tokens = self.preprocess(user_input)
-        processed_input = ' '.join(tokens)
-
-        # Example of handling a specific user input
-        if "word count" in processed_input:
-            word_count = len(text.get("1.0", END).split())
-            return f"The current word count is {word_count}."
-        elif "character count" in processed_input:
-            char_count = len(text.get("1.0", END)) - 1
-            return f"The current character count is {char_count}."
-        elif "uppercase" in processed_input:
-            current_text = text.get("1.0", END)
-            text.delete("1.0", END)
-            text.insert(END, current_text.upper())
-            return "Text converted to uppercase."
-        elif "lowercase" in processed_input:
-            current_text = text.get("1.0", END)
-            text.delete("1.0", END)
-            text.insert(END, current_text.lower())
-            return "Text converted to lowercase."
-        # Add additional handling for other inputs...
-
-        # Default response for unrecognized input
         return random.choice([
             "I'm not sure how to respond to that. Can you rephrase?",
             "That's an interesting point. Can you elaborate?",
@@ -94,14 +114,39 @@ def custom_ai_assistant():
     ai_window.title("Advanced AI Assistant")
     ai_window.geometry("500x600")
 
-    # Chat frame and text widget for displaying conversation
-    chat_frame = Frame(ai_window)
-    chat_frame.pack(fill=BOTH, expand=True)
-    chat_text = Text(chat_frame, state='disabled', wrap=WORD)
-    chat_text.pack(side=LEFT, fill=BOTH, expand=True)
-    chat_scrollbar = Scrollbar(chat_frame, command=chat_text.yview)
-    chat_scrollbar.pack(side=RIGHT, fill=Y)
-    chat_text.config(yscrollcommand=chat_scrollbar.set)
+    # Search frame for finding earlier turns of the conversation
+    search_frame = Frame(ai_window)
+    search_frame.pack(fill=X, side=TOP)
+    search_field = Entry(search_frame)
+    search_field.pack(side=LEFT, fill=X, expand=True)
+    search_results = []
+
+    def search_history(event=None):
+        """
+        Show the next turn matching the search, wrapping around to the first one.
+        """
+        query = search_field.get()
+        current = chat_view.highlight
+        if not current or current[1] != query:
+            search_results[:] = ai.conversation_history.search(query)
+        if not search_results:
+            search_label.config(text="No matches")
+            return
+        later = [number for number in search_results if current and current[1] == query and number > current[0]]
+        number = later[0] if later else search_results[0]
+        search_label.config(text=f"{search_results.index(number) + 1} of {len(search_results)}")
+        chat_view.show_turn(number, query)
+
+    search_button = Button(search_frame, text="Search", command=search_history)
+    search_button.pack(side=RIGHT)
+    search_label = Label(search_frame, text="")
+    search_label.pack(side=RIGHT)
+    search_field.bind("<Return>", search_history)
+
+    # Chat view showing only the visible part of the conversation
+    chat_view = ChatView(ai_window, ai.conversation_history)
+    chat_view.pack(fill=BOTH, expand=True)
+    ai_window.bind("<Destroy>", lambda event: event.widget is ai_window and ai.conversation_history.close())
 
     # Input frame and entry widget for user input
     input_frame = Frame(ai_window)
@@ -115,12 +160,30 @@ def custom_ai_assistant():
         """
         user_message = input_field.get()
         input_field.delete(0, END)
-        chat_text.config(state='normal')
-        chat_text.insert(END, f"You: {user_message}\n")
-        ai_reply = ai.generate_response(user_message)
-        chat_text.insert(END, f"AI: {ai_reply}\n\n")
-        chat_text.config(state='disabled')
-        chat_text.see(END)
+        chat_view.add("You", user_message)
+        # The command runs on a worker against a snapshot; edits are applied here on the UI thread
+        snapshot = text.get("1.0", "end-1c")
+        future = ai.commands.submit(user_message, snapshot)
+
+        def show_reply():
+            if not future.done():
+                root.after(20, show_reply)
+                return
+            try:
+                ai_reply, new_text, _ = future.result()
+            except Exception as e:
+                ai_reply, new_text = f"Error: {e}", None
+            if new_text is not None and text.get("1.0", "end-1c") != snapshot:
+                # Replacing the buffer now would throw away what was typed since the command started
+                ai_reply, new_text = "The text changed while the command was running, so it was left as it is. Please try again.", None
+            if new_text is not None:
+                word_completer.reset()  # Rebuilt on next use rather than followed through the whole replace
+                text.edit_separator()
+                text.replace("1.0", "end-1c", new_text)
+                text.edit_separator()
+            if chat_view.winfo_exists():
+                chat_view.add("AI", ai_reply)
+        root.after(20, show_reply)
 
     send_button = Button(input_frame, text="Send", command=send_message)
     send_button.pack(side=RIGHT)
@@ -132,13 +195,7 @@ def custom_ai_assistant():
         """
         help_text = (
             "Advanced AI Assistant Help:\n\n"
-            "- Word count: Get the current word count\n"
-            "- Character count: Get the current character count\n"
-            "- Uppercase: Convert text to uppercase\n"
-            "- Lowercase: Convert text to lowercase\n"
-            "- Clear: Clear all text\n"
-            "- Sentiment: Analyze the sentiment of the text\n"
-            "- Keywords: Extract top keywords from the text\n"
+            f"{ai.commands.help_text()}\n"
             "\nYou can also have a conversation with the AI about various topics!"
         )
         messagebox.showinfo("AI Assistant Help", help_text)
@@ -245,6 +302,100 @@ def api_interaction():
     create_post_button = Button(create_post_frame, text="Create Post", command=create_post)
     create_post_button.pack()
 
+# Function to write the text to a file and keep the file watcher in sync
+def write_file(path, all_text):
+    global disk_conflict
+    # Only patch the file in place if it still holds the last saved version
+    old_bytes = None
+    if saved_snapshot.path == path and not (file_watcher and file_watcher.path == path and file_watcher.changed_on_disk()):
+        old_bytes = to_disk_bytes(saved_snapshot.text(), file_encoding)
+    write_minimal(path, old_bytes, to_disk_bytes(all_text, file_encoding))
+    saved_snapshot.set(all_text, path)
+    text.edit_modified(False)
+    disk_conflict = False
+    if file_watcher and file_watcher.path == path:
+        file_watcher.mark_synced()
+
+# Function to read a file, returning its text and the encoding it was decoded with
+def read_file(path):
+    with open(path, "rb") as file:
+        return decode_text(file.read())
+
+# Function to save the cursor, language, folds and highlighter checkpoints of a file
+# (only when it is closed or another one is opened, since the newline index takes a full scan)
+def remember_file_state(path=None):
+    path = path or filename
+    if not path or path != saved_snapshot.path:
+        return
+    try:
+        folds = text.tag_ranges("folded")
+        file_state_cache.store(
+            path,
+            cursor=text.index(INSERT),
+            language=syntax_highlighter.language,
+            encoding=file_encoding,
+            folds=[[str(folds[i]), str(folds[i + 1])] for i in range(0, len(folds), 2)],
+            checkpoints=syntax_highlighter.checkpoints,
+            offsets=newline_index(saved_snapshot.text()))
+    except Exception as e:
+        print(f"Error saving file state: {e}")
+
+# Function to start watching a file for changes made by other programs
+def watch_file(path):
+    global file_watcher
+    if file_watcher:
+        file_watcher.stop()
+    file_watcher = FileWatcher(path, on_append=tail_into_buffer, on_change=merge_disk_changes, encoding=file_encoding)
+    file_watcher.start(root)
+
+# Function to append data that another program wrote to the end of the file
+def tail_into_buffer(new_text):
+    at_bottom = text.yview()[1] >= 1.0
+    modified = text.edit_modified()
+    # Text from disk is not an edit, so keep it out of the undo history
+    undo = text.cget("undo")
+    text.config(undo=False)
+    text.insert("end-1c", new_text)
+    text.config(undo=undo)
+    saved_snapshot.append(new_text)
+    text.edit_modified(modified)
+    if at_bottom:
+        text.see(END)
+
+# Function to split text into lines with their newlines, the way the Text widget counts lines
+# (str.splitlines would also split on form feeds and other separators Tk ignores)
+def split_lines(all_text):
+    lines = [line + "\n" for line in all_text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+# Function to merge a changed file into the editor, touching only the changed lines
+def merge_disk_changes(new_text):
+    global disk_conflict
+    saved_snapshot.set(new_text, file_watcher.path)
+    if text.edit_modified() and not messagebox.askyesno("NotPad", "The file changed on disk. Reload it and lose unsaved changes?"):
+        # Keep the user's version, but never let auto-save overwrite the disk version with it
+        disk_conflict = True
+        return
+    disk_conflict = False
+    word_completer.reset()  # Rebuilt on next use rather than followed through every changed range
+    old_lines = split_lines(text.get("1.0", "end-1c"))
+    new_lines = split_lines(new_text)
+    # Apply bottom-up so line numbers of earlier ranges stay valid. The reload is not
+    # recorded for undo, and older undo steps no longer match the text, so drop them.
+    undo = text.cget("undo")
+    text.config(undo=False)
+    for tag, i1, i2, j1, j2 in reversed(diff_lines(old_lines, new_lines)):
+        if tag == "equal":
+            continue
+        text.delete(f"{i1 + 1}.0", f"{i2 + 1}.0")
+        text.insert(f"{i1 + 1}.0", "".join(new_lines[j1:j2]))
+    text.config(undo=undo)
+    text.edit_reset()
+    text.edit_modified(False)
+
 # Function to create a new file
 def new_file():
     global filename
@@ -252,7 +403,7 @@ def new_file():
         filename = filedialog.asksaveasfilename()
         if filename:
             all_text = text.get(1.0, END)
-            open(filename, "w").write(all_text)
+            write_file(filename, all_text)
     if askyesno("NotPad", "Open Existing Work?"):
         text.delete(1.0, END)
         file = open(filedialog.askopenfilename(), "r")
@@ -261,18 +412,166 @@ def new_file():
             text.insert(INSERT, txt)
         else:
             text.delete(1.0, END)
+        # Undo must not bring back the previous document
+        text.edit_reset()
+        text.edit_modified(False)
 
 # Function to open an existing file
 def open_file():
-    global filename
+    path = filedialog.askopenfilename()
+    if path:
+        open_path(path)
+
+# Function to load a file into the editor, restoring its state from the last session
+def open_path(path):
+    global filename, file_encoding
+    remember_file_state()
+    stop_tail()
+    try:
+        txt, file_encoding = read_file(path)
+    except Exception as e:
+        print(f"Error opening file: {e}")
+        return
+    # The vocabulary of the new document is only built once prose completion is used
+    word_completer.reset()
     text.delete(1.0, END)
-    file = open(filedialog.askopenfilename(), "r")
-    if file != "":
-        txt = file.read()
-        text.insert(INSERT, txt)
-        filename = filedialog.askopenfilename()
+    text.insert(INSERT, txt)
+    saved_snapshot.set(txt, path)
+    # Undo must not bring back the previous file, which auto-save would then write over this one
+    text.edit_reset()
+    text.edit_modified(False)
+    filename = path
+    watch_file(filename)
+    state = file_state_cache.load(path)
+    # The newline index saved with the file lets the first search skip scanning for lines
+    incremental_search.refresh_snapshot()
+    incremental_search.seed_line_starts(txt, state["newline_index"] if state else None)
+    if state and state["encoding"] == file_encoding:
+        # The file has not changed since we last saw it, so the lexer checkpoints are still valid
+        syntax_highlighter.set_language(state["language"], state["checkpoints"])
+        for first, last in state["folds"]:
+            text.tag_add("folded", first, last)
+        jump_to(*state["cursor"].split("."))
     else:
-        pass
+        syntax_highlighter.set_language(get_language())
+        text.mark_set(INSERT, "1.0")
+    schedule_symbol_index()
+    refresh_recent_files()
+
+# Function to list the recently opened files in the File menu
+def refresh_recent_files():
+    recent_menu.delete(0, END)
+    for path in file_state_cache.recent_files():
+        recent_menu.add_command(label=path, command=lambda path=path: open_path(path))
+
+# Function to show the changes made since the file was last saved
+def show_changes():
+    old_lines = saved_snapshot.text().splitlines()
+    new_lines = text.get("1.0", "end-1c").splitlines()
+    DiffView(root, old_lines, new_lines)
+
+# Function to export the highlighted document as HTML, RTF or ANSI text
+def export_document(fmt):
+    extension = FORMATS[fmt]
+    path = filedialog.asksaveasfilename(defaultextension=extension, filetypes=[(fmt.upper(), "*" + extension)])
+    if not path:
+        return
+    started = time.time()
+    status_bar.config(text=f"Exporting to {os.path.basename(path)}...")
+    future = exporter.submit(text.get("1.0", "end-1c"), syntax_highlighter.language, path, fmt,
+                             checkpoints=syntax_highlighter.checkpoints)
+
+    def check_done():
+        if not future.done():
+            root.after(100, check_done)
+        elif future.exception():
+            status_bar.config(text=f"Export failed: {future.exception()}")
+        else:
+            status_bar.config(text=f"Exported {os.path.basename(path)} in {time.time() - started:.1f}s")
+    root.after(100, check_done)
+
+# Function to stop following a file or pipe
+def stop_tail():
+    global log_tail
+    if log_tail:
+        log_tail.stop()
+        log_tail = None
+        status_bar.config(text="NotPad")
+
+# Function to follow a log file or standard input in tail mode
+def tail_mode():
+    def browse():
+        path = filedialog.askopenfilename()
+        if path:
+            path_entry.delete(0, END)
+            path_entry.insert(0, path)
+
+    def start_tail():
+        global log_tail, filename, file_watcher
+        path = path_entry.get() or None
+        if path is None and not stdin_var.get():
+            messagebox.showerror("Tail Mode", "Choose a file or follow standard input.")
+            return
+        try:
+            max_lines = int(scrollback_entry.get())
+        except ValueError:
+            messagebox.showerror("Tail Mode", "Scrollback must be a number of lines.")
+            return
+        pattern = filter_entry.get()
+        filters = [(pattern, "tail_match")] if pattern else []
+        try:
+            new_tail = LogTail(text, path=None if stdin_var.get() else path, max_lines=max_lines,
+                               filters=filters, from_start=start_var.get())
+        except Exception as e:
+            messagebox.showerror("Tail Mode", f"Invalid highlight pattern: {e}")
+            return
+        # Following a log replaces the buffer, so never drop unsaved edits without asking
+        if text.edit_modified() and not messagebox.askyesno("Tail Mode", "Following a log replaces the document. Discard unsaved changes?", parent=tail_window):
+            return
+        stop_tail()
+        # The buffer no longer mirrors a file, so keep auto-save and the watcher away from it
+        if file_watcher:
+            file_watcher.stop()
+            file_watcher = None
+        filename = None
+        saved_snapshot.set("")
+        word_completer.reset()
+        text.delete(1.0, END)
+        text.edit_reset()
+        text.edit_modified(False)
+        text.tag_config("tail_match", background="yellow")
+        log_tail = new_tail
+        log_tail.start()
+        status_bar.config(text=f"Following {'standard input' if stdin_var.get() else path}")
+        tail_window.destroy()
+
+    tail_window = Toplevel(root)
+    tail_window.title("Tail Mode")
+    path_label = Label(tail_window, text="File:")
+    path_label.grid(row=0, column=0, padx=5, pady=5)
+    path_entry = Entry(tail_window)
+    path_entry.grid(row=0, column=1, padx=5, pady=5)
+    browse_button = Button(tail_window, text="Browse", command=browse)
+    browse_button.grid(row=0, column=2, padx=5, pady=5)
+    stdin_var = BooleanVar(value=False)
+    stdin_check = Checkbutton(tail_window, text="Follow standard input", variable=stdin_var)
+    stdin_check.grid(row=1, columnspan=3, padx=5, pady=5)
+    start_var = BooleanVar(value=False)
+    start_check = Checkbutton(tail_window, text="Read from the beginning", variable=start_var)
+    start_check.grid(row=2, columnspan=3, padx=5, pady=5)
+    scrollback_label = Label(tail_window, text="Scrollback lines:")
+    scrollback_label.grid(row=3, column=0, padx=5, pady=5)
+    scrollback_entry = Entry(tail_window)
+    scrollback_entry.insert(0, "10000")
+    scrollback_entry.grid(row=3, column=1, padx=5, pady=5)
+    filter_label = Label(tail_window, text="Highlight (regex):")
+    filter_label.grid(row=4, column=0, padx=5, pady=5)
+    filter_entry = Entry(tail_window)
+    filter_entry.grid(row=4, column=1, padx=5, pady=5)
+    follow_button = Button(tail_window, text="Follow", command=start_tail)
+    follow_button.grid(row=5, column=0, padx=5, pady=5)
+    stop_button = Button(tail_window, text="Stop", command=lambda: (stop_tail(), tail_window.destroy()))
+    stop_button.grid(row=5, column=1, padx=5, pady=5)
 
 # Function to save the current file with a new name
 def save_as():
@@ -280,39 +579,62 @@ def save_as():
     filename = filedialog.asksaveasfilename()
     if filename:
         all_text = text.get(1.0, END)
-        open(filename, "w").write(all_text)
+        write_file(filename, all_text)
+        watch_file(filename)
 
 # Function to close the application, optionally saving the current work
 def close():
     global filename
+    remember_file_state()
     if askyesno("NotPad", "Save Existing Work?"):
         filename = filedialog.asksaveasfilename()
         if filename:
             all_text = text.get(1.0, END)
-            open(filename, "w").write(all_text)
+            write_file(filename, all_text)
+            remember_file_state(filename)
         root.destroy()
     else:
         root.destroy()
 
 # Function to cut the selected text
 def cut():
-    text.clipboard_clear()
-    text.clipboard_append(text.selection_get())
-    selection = text.get(SEL_FIRST, SEL_LAST)
-    text.delete(SEL_FIRST, SEL_LAST)
+    if text.tag_ranges(SEL):
+        copy()
+        text.delete(SEL_FIRST, SEL_LAST)
 
 # Function to copy the selected text
 def copy():
-    text.clipboard_clear()
-    text.clipboard_append(text.selection_get())
+    if text.tag_ranges(SEL):
+        text.clipboard_clear()
+        text.clipboard_append(text.get(SEL_FIRST, SEL_LAST))
 
-# Function to paste text from the clipboard
-def paste():
+# Function to paste text from the clipboard, in chunks if it is large
+def paste(event=None):
     try:
-        txt = text.selection_get(selection="CLIPBOARD")
-        text.insert(INSERT, txt)
-    except:
-        pass
+        txt = text.clipboard_get()
+    except TclError:
+        return "break"
+    if paste_pipeline.active:
+        return "break"
+    syntax_highlighter.suspended = True
+    pause_edit_observer()  # Resumed by paste_done, so the chunks are reported as one edit
+    paste_pipeline.paste(txt)
+    return "break"
+
+# Function to show how far a large paste has got
+def show_paste_progress(inserted, total):
+    status_bar.config(text=f"Pasting... {inserted * 100 // total}%")
+
+# Function to catch up on highlighting and status updates once a paste is complete
+def paste_done():
+    edit_observer.resume()
+    syntax_highlighter.suspended = False
+    syntax_highlighter.schedule()
+    for listener in viewport_listeners:
+        listener()
+    update_status_bar()
+    schedule_symbol_index()
+    on_text_edited()
 
 # Function to delete the selected text
 def erase():
@@ -397,10 +719,15 @@ def online_help():
 # Function to auto-save the file every minute
 def auto_save():
     global filename
-    if filename:
-        all_text = text.get(1.0, END)
-        open(filename, "w").write(all_text)
+    # Schedule the next run first, so a failed save does not stop auto-saving
     root.after(60000, auto_save)
+    # Never overwrite changes made on disk that the watcher has not merged yet, or that the user chose not to load
+    if filename and text.edit_modified() and not disk_conflict and not (file_watcher and file_watcher.changed_on_disk()):
+        all_text = text.get(1.0, END)
+        try:
+            write_file(filename, all_text)
+        except Exception as e:
+            print(f"Error auto-saving file: {e}")
 
 # Function to show the line numbers in the text widget
 def show_line_numbers(event=None):
@@ -408,9 +735,243 @@ def show_line_numbers(event=None):
 
 # Function to update the status bar with the current line and column
 def update_status_bar(event=None):
+    if paste_pipeline.active:
+        return
     line, column = map(int, text.index("@0,0").split("."))
     status_bar.config(text=f"Line: {line + 1}, Column: {column + 1}")
 
+# Function to keep the scrollbar and viewport-based features in sync with the visible text
+def on_text_scroll(first, last):
+    scroll_bar.set(first, last)
+    if paste_pipeline.active:
+        return  # Caught up by paste_done
+    for listener in viewport_listeners:
+        listener()
+
+# Function to switch the saved copy of the document between plain and compressed storage
+def toggle_compact_storage():
+    saved_snapshot.set_compact(compact_storage_var.get())
+    update_memory_usage(repeat=False)
+
+# Function to show how much memory the stored document copies take
+def update_memory_usage(repeat=True):
+    stored, raw = memory_usage()
+    if not saved_snapshot.compact:
+        plain, _ = saved_snapshot.memory()
+        stored += plain
+        raw += plain
+    memory_label.config(text=f"Stored: {stored / 1048576:.1f} MB ({raw / 1048576:.1f} MB uncompressed)")
+    if repeat:
+        root.after(5000, update_memory_usage)
+
+# Function to turn background spell checking on or off
+def toggle_spell_check():
+    global spell_checker
+    if spell_checker is None:
+        spell_checker = SpellChecker(text)
+        viewport_listeners.append(spell_checker.schedule)
+        text.bind("<KeyRelease>", spell_checker.schedule, add="+")
+    if spell_check_var.get():
+        spell_checker.enable()
+    else:
+        spell_checker.disable()
+
+# Function to get the language of the current file from its extension
+def get_language():
+    if filename:
+        _, ext = os.path.splitext(filename)
+        if ext == ".py":
+            return "python"
+        elif ext in [".cpp", ".c"]:
+            return "c++"
+        elif ext == ".java":
+            return "java"
+        try:
+            return get_lexer_for_filename(filename).aliases[0]
+        except ClassNotFound:
+            return "text"  # Default to plain text
+    return "text"  # Default to plain text
+
+# Function to move the cursor to a position and scroll it into view
+def jump_to(line, column=0):
+    text.mark_set(INSERT, f"{line}.{column}")
+    text.see(INSERT)
+    text.focus_set()
+
+# Function to show completions from the words of the document, waiting for the vocabulary
+# if it is still being built
+def show_word_completions():
+    global word_completion_after_id
+    word_completion_after_id = None
+    if word_completer.loading():
+        word_completion_after_id = root.after(50, show_word_completions)
+        return
+    prefix = text.get("insert-1c wordstart", INSERT)
+    if prefix.isalnum() or prefix.isidentifier():
+        completion_popup.show(word_completer.complete(prefix), prefix)
+    else:
+        completion_popup.hide()
+
+# Function to suggest completions for the word before the cursor, from Jedi for Python
+# and from the words of the document for everything else
+def update_completions(event=None):
+    global completion_future
+    if event is not None and (event.keysym in ("Up", "Down", "Tab", "Return", "Escape")
+                              or not event.char and event.keysym != "BackSpace"):
+        return  # Keys handled by the popup, modifiers and cursor movement
+    prefix = text.get("insert-1c wordstart", INSERT)
+    if not (prefix.isalnum() or prefix.isidentifier()):
+        completion_popup.hide()
+        return
+    if get_language() != "python":
+        completion_future = None  # Drop a Python lookup still running
+        if word_completer.state is None:
+            # First use: index the document in the background; edits are followed from now on
+            word_completer.start(text.get("1.0", "end-1c"))
+        if word_completion_after_id is None:
+            show_word_completions()
+        return
+    if word_completer.state is not None:
+        word_completer.reset()  # Prose completion is not in use, so stop following edits
+    line, column = map(int, text.index(INSERT).split("."))
+    future = completion_executor.submit(
+        lambda code: [c.name for c in jedi.Script(code, path=filename).complete(line, column)[:10]],
+        text.get("1.0", "end-1c"))
+    completion_future = future
+
+    def check_done():
+        if future is not completion_future:
+            return  # A newer keystroke asked again
+        if not future.done():
+            root.after(50, check_done)
+        elif not future.exception():
+            completion_popup.show(future.result(), prefix)
+    root.after(50, check_done)
+
+# Function to rebuild the symbol index once typing pauses
+def schedule_symbol_index(event=None):
+    global symbol_index_after_id
+    if symbol_index_after_id:
+        root.after_cancel(symbol_index_after_id)
+    symbol_index_after_id = root.after(1000, index_symbols)
+
+# Function to bring the symbol index up to date on a worker, then call the callback
+def index_symbols(callback=None):
+    global symbol_index_after_id
+    symbol_index_after_id = None
+    language = get_language()
+    if language == "text":
+        return
+    code = text.get("1.0", "end-1c")
+    if symbol_index.is_current(code, language):
+        if callback:
+            callback()
+        return
+    future = symbol_index.submit(code, language)
+
+    def check_done():
+        if not future.done():
+            root.after(50, check_done)
+            return
+        symbol_index.apply(future.result())
+        refresh_outline()
+        if callback:
+            callback()
+    root.after(50, check_done)
+
+# Function to jump to the definition of the name under the cursor
+def goto_definition(event=None):
+    name = text.get("insert wordstart", "insert wordend").strip()
+    line = int(text.index(INSERT).split(".")[0])
+
+    def jump():
+        symbol = symbol_index.find_definition(name, line)
+        if symbol:
+            jump_to(symbol.line, symbol.column)
+        else:
+            status_bar.config(text=f"No definition found for '{name}'")
+    if name:
+        index_symbols(jump)
+    return "break"
+
+# Function to fill the outline panel from the symbol index
+def refresh_outline():
+    if outline_listbox is None or not outline_listbox.winfo_exists():
+        return
+    outline_symbols[:] = [symbol for symbol in symbol_index.symbols if symbol.kind != "variable"]
+    outline_listbox.delete(0, END)
+    outline_listbox.insert(END, *[f"{'    ' * symbol.depth}{symbol.name} ({symbol.kind})" for symbol in outline_symbols])
+
+# Function to show an outline of the classes and functions in the current file
+def show_outline():
+    global outline_listbox
+    if outline_listbox is not None and outline_listbox.winfo_exists():
+        outline_listbox.winfo_toplevel().lift()
+        return
+    outline_window = Toplevel(root)
+    outline_window.title("Outline")
+    outline_window.geometry("300x600")
+    outline_listbox = Listbox(outline_window)
+    outline_listbox.pack(side=LEFT, fill=BOTH, expand=True)
+    outline_scrollbar = Scrollbar(outline_window, command=outline_listbox.yview)
+    outline_scrollbar.pack(side=RIGHT, fill=Y)
+    outline_listbox.config(yscrollcommand=outline_scrollbar.set)
+
+    def open_symbol(event=None):
+        selection = outline_listbox.curselection()
+        if selection:
+            symbol = outline_symbols[selection[0]]
+            jump_to(symbol.line, symbol.column)
+    outline_listbox.bind("<Double-Button-1>", open_symbol)
+    outline_listbox.bind("<Return>", open_symbol)
+    refresh_outline()
+    index_symbols()
+
+# Function to bring the fold regions up to date with the text
+def update_folds():
+    fold_index.update(text.get("1.0", "end-1c").split("\n"))
+
+# Function to collapse the lines of a fold region, keeping its header line visible
+def fold_region(header, last):
+    text.tag_add("folded", f"{header}.0 lineend", f"{last}.0 lineend")
+
+# Function to fold or unfold the block at the cursor
+def toggle_fold(event=None):
+    update_folds()
+    line = int(text.index(INSERT).split(".")[0])
+    folded = text.tag_nextrange("folded", f"{line}.0 lineend")
+    if folded and text.compare(folded[0], "==", f"{line}.0 lineend"):
+        text.tag_remove("folded", *folded)
+        return "break"
+    region = fold_index.region_at(line)
+    if region:
+        fold_region(*region)
+        text.mark_set(INSERT, f"{region[0]}.0")
+    return "break"
+
+# Function to fold every function (or every top-level block in plain text)
+def fold_all_functions():
+    update_folds()
+
+    def fold_functions():
+        ranges = []
+        for symbol in symbol_index.symbols:
+            if symbol.kind == "function":
+                region = fold_index.region_starting_near(symbol.line)
+                if region:
+                    ranges += [f"{region[0]}.0 lineend", f"{region[1]}.0 lineend"]
+        if ranges:
+            text.tag_add("folded", *ranges)
+    if get_language() == "text":
+        for region in fold_index.top_level_regions():
+            fold_region(*region)
+    else:
+        index_symbols(fold_functions)
+
+# Function to expand all folded blocks
+def unfold_all():
+    text.tag_remove("folded", "1.0", END)
+
 # Function to toggle word wrap in the text widget
 def toggle_word_wrap(event=None):
     if word_wrap_var.get():
@@ -438,34 +999,43 @@ def align_right():
     text.tag_add("right", "sel.first", "sel.last")
     text.tag_config("right", justify="right")
 
-# Function to create a numbered list from the selected text
+# Function to stop observing edits until edit_observer.resume(), reporting the selected lines
+# (or the insert line) as one edit then
+def pause_edit_observer():
+    if text.tag_ranges(SEL):
+        edit_observer.pause(SEL_FIRST, SEL_LAST)
+    else:
+        edit_observer.pause(INSERT, INSERT)
+
+# Function to run a transform over the selected lines as one observed edit rather than one per line
+def transform_lines(make_edits, *args):
+    pause_edit_observer()
+    try:
+        transform_selection(text, make_edits, *args)
+    finally:
+        edit_observer.resume()
+
+# Function to create a numbered list from the selected lines
 def create_numbered_list():
-    selected_text = text.get("sel.first", "sel.last")
-    lines = selected_text.splitlines()
-    numbered_list = "\n".join(f"{i+1}. {line}" for i, line in enumerate(lines))
-    text.delete("sel.first", "sel.last")
-    text.insert("sel.first", numbered_list)
+    transform_lines(numbered_list_edits)
 
-# Function to create a bulleted list from the selected text
+# Function to create a bulleted list from the selected lines
 def create_bulleted_list():
-    selected_text = text.get("sel.first", "sel.last")
-    lines = selected_text.splitlines()
-    bulleted_list = "\n".join(f"- {line}" for line in lines)
-    text.delete("sel.first", "sel.last")
-    text.insert("sel.first", bulleted_list)
+    transform_lines(bulleted_list_edits)
 
-# Function to indent the selected text
+# Function to indent the selected lines
 def indent():
-    text.insert("insert", "    ")
+    transform_lines(indent_edits)
 
-# Function to unindent the selected text
+# Function to unindent the selected lines
 def unindent():
-    start_index = "insert linestart"
-    end_index = "insert lineend"
-    selected_text = text.get(start_index, end_index)
-    if selected_text.startswith("    "):
-        text.delete(start_index, end_index)
-        text.insert(start_index, selected_text[4:])
+    transform_lines(unindent_edits)
+
+# Function to comment or uncomment the selected lines
+def toggle_comment(event=None):
+    prefix = "// " if get_language() in ("c++", "java") else "# "
+    transform_lines(comment_edits, prefix)
+    return "break"
 
 # Function to create a table
 def create_table():
@@ -531,129 +1101,297 @@ def find_and_replace_wrapper(text):
     close_button = Button(find_replace_window, text="Close", command=find_replace_window.destroy)
     close_button.grid(row=3, column=1, padx=5, pady=5)
 
-# Initialize Tkinter root
-root = Tk()
-root.title("NotPad")
-root.geometry("800x600")
-
-# Create main menu
-main_menu = Menu(root)
-commands = Menu(main_menu)
-root.config(menu=main_menu)
-main_menu.add_cascade(label="File", menu=commands)
-commands.add_command(label="New File", command=new_file)
-commands.add_command(label="Open", command=open_file)
-commands.add_command(label="Save As", command=save_as)
-commands.add_command(label="Close", command=close)
-
-# Edit menu setup
-edit_menu = Menu(main_menu)
-main_menu.add_cascade(label="Edit", menu=edit_menu)
-edit_menu.add_command(label="Cut", command=cut)
-edit_menu.add_command(label="Copy", command=copy)
-edit_menu.add_command(label="Paste", command=paste)
-edit_menu.add_separator()
-edit_menu.add_command(label="Delete", command=erase)
-edit_menu.add_command(label="Clear Screen", command=clear_screen)
-edit_menu.add_command(label="Find and Replace", command=lambda: find_and_replace_wrapper(text))
-
-# View menu setup
-view_menu = Menu(main_menu, tearoff=0)
-main_menu.add_cascade(label="View", menu=view_menu)
-view_menu.add_command(label="Toggle Fullscreen", command=toggle_fullscreen)
-
-# Insert menu setup
-insert_menu = Menu(main_menu)
-main_menu.add_cascade(label="Insert", menu=insert_menu)
-insert_menu.add_command(label="Current Date", command=date)
-
-# Format menu setup
-change_format = Menu(main_menu)
-main_menu.add_cascade(label="Format", menu=change_format)
-change_format.add_command(label="Font", command=text_color)
-change_format.add_command(label="No Format", command=no_format)
-change_format.add_command(label="Bold", command=bold)
-change_format.add_command(label="Italic", command=italic)
-change_format.add_command(label="Underline", command=underline)
-change_format.add_separator()
-change_format.add_command(label="Align Left", command=align_left)
-change_format.add_command(label="Align Center", command=align_center)
-change_format.add_command(label="Align Right", command=align_right)
-change_format.add_separator()
-change_format.add_command(label="Numbered List", command=create_numbered_list)
-change_format.add_command(label="Bulleted List", command=create_bulleted_list)
-change_format.add_separator()
-change_format.add_command(label="Create Table", command=create_table)
-
-# Personalize menu setup
-personalize = Menu(main_menu)
-main_menu.add_cascade(label="Personalize", menu=personalize)
-personalize.add_command(label="Background", command=background)
-
-# Help menu setup
-user_help = Menu(main_menu)
-main_menu.add_cascade(label="Help", menu=user_help)
-user_help.add_command(label="Online Help", command=online_help)
-
-# AI menu and API menu setup
-setup_menu(root, Text, main_menu)
-
-# Text widget setup
-text = Text(root, height=40, width=100, font=("Arial", 10))
-scroll_bar = Scrollbar(root, command=text.yview)
-text.config(yscrollcommand=scroll_bar.set)
-scroll_bar.pack(side=RIGHT, fill=Y)
-text.pack()
-
-# Line Number Frame
-line_number_frame = Frame(root, width=30)
-line_number_frame.pack(side=LEFT, fill=Y)
-line_number_label = Label(line_number_frame, text="1", font=("Arial", 10), anchor="nw")
-line_number_label.pack(side=TOP, fill=Y)
-
-# Status Bar
-status_bar = Label(root, text="NotPad", anchor=W)
-status_bar.pack(side=BOTTOM, fill=X)
-
-# Word Wrap Option
-word_wrap_var = BooleanVar(value=False)
-word_wrap_check = Checkbutton(root, text="Word Wrap", variable=word_wrap_var, command=toggle_word_wrap)
-word_wrap_check.pack(side=BOTTOM, anchor=W)
-
-# Font Selection OptionMenu
-font_var = StringVar(root)
-font_var.set("Arial")
-font_options = ["Arial", "Courier", "Times New Roman", "Verdana"]
-font_menu = OptionMenu(root, font_var, *font_options, command=change_font)
-font_menu.pack(side=BOTTOM, anchor=W)
-
-# Indent and Unindent Buttons
-indent_button = Button(root, text="Indent", command=indent)
-indent_button.pack(side=BOTTOM, anchor=W)
-unindent_button = Button(root, text="Unindent", command=unindent)
-unindent_button.pack(side=BOTTOM, anchor=W)
-
-# Set filename to None initially
-filename = None
-
-# Auto-save setup
-auto_save()
-
-# Bindings for line numbers and status bar updates
-text.bind("<KeyRelease>", update_status_bar)
-text.bind("<Return>", show_line_numbers)
-text.bind("<BackSpace>", show_line_numbers)
-text.bind("<Delete>", show_line_numbers)
-text.bind("<Control-a>", show_line_numbers)
-text.bind("<Control-Home>", show_line_numbers)
-
-# Bindings for toggle fullscreen and resize events
-root.bind("<F11>", toggle_fullscreen)
-root.bind("<Configure>", on_resize)
-api_menu = Menu(main_menu, tearoff=0)
-main_menu.add_cascade(label="API", menu=api_menu)
-api_menu.add_command(label="Open API Interface", command=api_interaction)
-# Main loop
+# Batch mode applies the document transforms to files without creating a window.
+# BatchMode runs as the __main__ module so its worker processes never import this file.
+if "--batch" in sys.argv:
+    import runpy
+    runpy.run_module("BatchMode", run_name="__main__", alter_sys=True)
+    sys.exit()
+
+# Function to show the search bar above the text
+def show_search_bar(event=None):
+    search_bar.pack(side=TOP, fill=X, before=text)
+    search_entry.focus_set()
+    search_entry.select_range(0, END)
+    incremental_search.refresh_snapshot()
+    if search_var.get():
+        run_search()
+    return "break"
+
+# Function to hide the search bar and its highlights
+def hide_search_bar(event=None):
+    global search_after_id
+    if search_after_id:
+        root.after_cancel(search_after_id)
+        search_after_id = None
+    search_bar.pack_forget()
+    incremental_search.clear()
+    text.focus_set()
+    return "break"
+
+# Function to search again shortly after the query or the text changes
+def schedule_search(*args):
+    global search_after_id
+    if search_after_id:
+        root.after_cancel(search_after_id)
+    search_after_id = root.after(150, run_search)
+
+# Function to start searching for the query in the search bar
+def run_search():
+    global search_after_id
+    search_after_id = None
+    search_count_label.config(text="Searching...")
+    incremental_search.search(search_var.get(), search_case_var.get(), search_regex_var.get())
+
+# Function to show the number of matches and which one is selected
+def update_search_count():
+    total = len(incremental_search.starts)
+    if incremental_search.error:
+        search_count_label.config(text=f"Invalid pattern: {incremental_search.error}")
+    elif not search_var.get():
+        search_count_label.config(text="")
+    elif not total:
+        search_count_label.config(text="No matches")
+    elif incremental_search.current is None:
+        search_count_label.config(text=f"{total} matches")
+    else:
+        search_count_label.config(text=f"{incremental_search.current + 1} of {total}")
+
+# Function to search the edited text again while the search bar is open
+def on_text_edited(event=None):
+    # Keys that move the cursor do not change the text
+    if event is not None and not (event.keysym in ("BackSpace", "Delete", "Return", "Tab")
+                                  or event.char and event.char.isprintable()):
+        return
+    if search_bar.winfo_ismapped() and search_var.get():
+        incremental_search.refresh_snapshot()
+        schedule_search()
+
+# The window is only built when NotPad runs as a program. Worker processes started with
+# "spawn" (e.g. the exporter's) import this file as __mp_main__ and only need its functions.
 if __name__ == "__main__":
+    # Initialize Tkinter root
+    root = Tk()
+    root.title("NotPad")
+    root.geometry("800x600")
+
+    # Create main menu
+    main_menu = Menu(root)
+    commands = Menu(main_menu)
+    root.config(menu=main_menu)
+    main_menu.add_cascade(label="File", menu=commands)
+    commands.add_command(label="New File", command=new_file)
+    commands.add_command(label="Open", command=open_file)
+    recent_menu = Menu(commands, tearoff=0)
+    commands.add_cascade(label="Recent Files", menu=recent_menu)
+    commands.add_command(label="Save As", command=save_as)
+    commands.add_command(label="Tail Mode", command=tail_mode)
+    commands.add_command(label="Changes Since Save", command=show_changes)
+    export_menu = Menu(commands, tearoff=0)
+    commands.add_cascade(label="Export", menu=export_menu)
+    export_menu.add_command(label="HTML", command=lambda: export_document("html"))
+    export_menu.add_command(label="RTF", command=lambda: export_document("rtf"))
+    export_menu.add_command(label="ANSI Text", command=lambda: export_document("ansi"))
+    commands.add_command(label="Close", command=close)
+
+    # Edit menu setup
+    edit_menu = Menu(main_menu)
+    main_menu.add_cascade(label="Edit", menu=edit_menu)
+    edit_menu.add_command(label="Cut", command=cut)
+    edit_menu.add_command(label="Copy", command=copy)
+    edit_menu.add_command(label="Paste", command=paste)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Delete", command=erase)
+    edit_menu.add_command(label="Clear Screen", command=clear_screen)
+    edit_menu.add_command(label="Find", command=show_search_bar, accelerator="Ctrl+F")
+    edit_menu.add_command(label="Find and Replace", command=lambda: find_and_replace_wrapper(text))
+    edit_menu.add_command(label="Go to Definition", command=goto_definition, accelerator="F12")
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Add Carets to Selected Lines", command=lambda: multi_cursor.carets_on_selected_lines())
+
+    # View menu setup
+    view_menu = Menu(main_menu, tearoff=0)
+    main_menu.add_cascade(label="View", menu=view_menu)
+    view_menu.add_command(label="Toggle Fullscreen", command=toggle_fullscreen)
+    spell_check_var = BooleanVar(value=False)
+    view_menu.add_checkbutton(label="Spell Check", variable=spell_check_var, command=toggle_spell_check)
+    compact_storage_var = BooleanVar(value=False)
+    view_menu.add_checkbutton(label="Compact Storage", variable=compact_storage_var, command=toggle_compact_storage)
+    view_menu.add_command(label="Outline", command=show_outline)
+    view_menu.add_separator()
+    view_menu.add_command(label="Toggle Fold", command=toggle_fold, accelerator="Ctrl+Shift+[")
+    view_menu.add_command(label="Fold All Functions", command=fold_all_functions)
+    view_menu.add_command(label="Unfold All", command=unfold_all)
+
+    # Insert menu setup
+    insert_menu = Menu(main_menu)
+    main_menu.add_cascade(label="Insert", menu=insert_menu)
+    insert_menu.add_command(label="Current Date", command=date)
+
+    # Format menu setup
+    change_format = Menu(main_menu)
+    main_menu.add_cascade(label="Format", menu=change_format)
+    change_format.add_command(label="Font", command=text_color)
+    change_format.add_command(label="No Format", command=no_format)
+    change_format.add_command(label="Bold", command=bold)
+    change_format.add_command(label="Italic", command=italic)
+    change_format.add_command(label="Underline", command=underline)
+    change_format.add_separator()
+    change_format.add_command(label="Align Left", command=align_left)
+    change_format.add_command(label="Align Center", command=align_center)
+    change_format.add_command(label="Align Right", command=align_right)
+    change_format.add_separator()
+    change_format.add_command(label="Numbered List", command=create_numbered_list)
+    change_format.add_command(label="Bulleted List", command=create_bulleted_list)
+    change_format.add_command(label="Toggle Comment", command=toggle_comment, accelerator="Ctrl+/")
+    change_format.add_separator()
+    change_format.add_command(label="Create Table", command=create_table)
+
+    # Personalize menu setup
+    personalize = Menu(main_menu)
+    main_menu.add_cascade(label="Personalize", menu=personalize)
+    personalize.add_command(label="Background", command=background)
+
+    # Help menu setup
+    user_help = Menu(main_menu)
+    main_menu.add_cascade(label="Help", menu=user_help)
+    user_help.add_command(label="Online Help", command=online_help)
+
+    # AI menu and API menu setup
+    setup_menu(root, Text, main_menu)
+
+    # Text widget setup
+    text = Text(root, height=40, width=100, font=("Arial", 10), undo=True, maxundo=1000)
+    scroll_bar = Scrollbar(root, command=text.yview)
+    text.config(yscrollcommand=on_text_scroll)
+    scroll_bar.pack(side=RIGHT, fill=Y)
+    text.pack()
+
+    # Folded regions are elided, so Tk skips them entirely when laying out and drawing lines
+    text.tag_config("folded", elide=True)
+
+    # Syntax highlighting of the visible lines
+    syntax_highlighter = SyntaxHighlighter(text)
+
+    # Search bar, shown with Ctrl+F
+    search_bar = Frame(root)
+    search_var = StringVar()
+    search_var.trace_add("write", schedule_search)
+    search_entry = Entry(search_bar, textvariable=search_var)
+    search_entry.pack(side=LEFT, fill=X, expand=True, padx=5, pady=2)
+    search_case_var = BooleanVar(value=False)
+    search_case_check = Checkbutton(search_bar, text="Match Case", variable=search_case_var, command=schedule_search)
+    search_case_check.pack(side=LEFT)
+    search_regex_var = BooleanVar(value=False)
+    search_regex_check = Checkbutton(search_bar, text="Regex", variable=search_regex_var, command=schedule_search)
+    search_regex_check.pack(side=LEFT)
+    search_count_label = Label(search_bar, text="", width=16)
+    search_count_label.pack(side=LEFT)
+    incremental_search = IncrementalSearch(text, on_update=update_search_count)
+    search_prev_button = Button(search_bar, text="Previous", command=incremental_search.previous_match)
+    search_prev_button.pack(side=LEFT)
+    search_next_button = Button(search_bar, text="Next", command=incremental_search.next_match)
+    search_next_button.pack(side=LEFT)
+    search_close_button = Button(search_bar, text="Close", command=hide_search_bar)
+    search_close_button.pack(side=LEFT, padx=5)
+    search_entry.bind("<Return>", incremental_search.next_match)
+    search_entry.bind("<Shift-Return>", incremental_search.previous_match)
+    search_entry.bind("<Escape>", hide_search_bar)
+
+    # Word completion popup
+    completion_popup = CompletionPopup(text)
+
+    # Multiple carets (Alt+Click) and column selection (Alt+Drag)
+    multi_cursor = MultiCursor(text)
+
+    # Large pastes are inserted in chunks without freezing the window. Created last so that
+    # its key binding runs first and stops a paste before any other handler edits the text.
+    paste_pipeline = PastePipeline(text, on_progress=show_paste_progress, on_done=paste_done)
+
+    # Line Number Frame
+    line_number_frame = Frame(root, width=30)
+    line_number_frame.pack(side=LEFT, fill=Y)
+    line_number_label = Label(line_number_frame, text="1", font=("Arial", 10), anchor="nw")
+    line_number_label.pack(side=TOP, fill=Y)
+
+    # Status Bar
+    status_bar = Label(root, text="NotPad", anchor=W)
+    status_bar.pack(side=BOTTOM, fill=X)
+    memory_label = Label(root, text="", anchor=E)
+    memory_label.pack(side=BOTTOM, fill=X)
+
+    # Word Wrap Option
+    word_wrap_var = BooleanVar(value=False)
+    word_wrap_check = Checkbutton(root, text="Word Wrap", variable=word_wrap_var, command=toggle_word_wrap)
+    word_wrap_check.pack(side=BOTTOM, anchor=W)
+
+    # Font Selection OptionMenu
+    font_var = StringVar(root)
+    font_var.set("Arial")
+    font_options = ["Arial", "Courier", "Times New Roman", "Verdana"]
+    font_menu = OptionMenu(root, font_var, *font_options, command=change_font)
+    font_menu.pack(side=BOTTOM, anchor=W)
+
+    # Indent and Unindent Buttons
+    indent_button = Button(root, text="Indent", command=indent)
+    indent_button.pack(side=BOTTOM, anchor=W)
+    unindent_button = Button(root, text="Unindent", command=unindent)
+    unindent_button.pack(side=BOTTOM, anchor=W)
+
+    # Set filename to None initially
+    filename = None
+    file_watcher = None
+    disk_conflict = False  # Set when the user kept their edits over a change made on disk
+    log_tail = None
+    saved_snapshot = Snapshot()
+    spell_checker = None
+    symbol_index = SymbolIndex()
+    symbol_index_after_id = None
+    outline_listbox = None
+    outline_symbols = []  # Symbols shown in the outline, in listbox order
+    fold_index = FoldIndex()
+    viewport_listeners = [syntax_highlighter.schedule, incremental_search.highlight_visible]  # Called whenever the visible part of the text changes
+    search_after_id = None
+    edit_observer = EditObserver(text)
+    word_completer = WordCompleter(edit_observer)
+    word_completion_after_id = None
+    completion_executor = ThreadPoolExecutor(max_workers=1)
+    completion_future = None
+    file_encoding = "utf-8"
+    file_state_cache = FileStateCache()
+    exporter = Exporter()
+    refresh_recent_files()
+
+    # Auto-save setup
+    auto_save()
+    update_memory_usage()
+
+    # Bindings for line numbers and status bar updates
+    text.bind("<KeyRelease>", update_status_bar)
+    text.bind("<Return>", show_line_numbers)
+    text.bind("<BackSpace>", show_line_numbers)
+    text.bind("<Delete>", show_line_numbers)
+    text.bind("<Control-a>", show_line_numbers)
+    text.bind("<Control-Home>", show_line_numbers)
+    text.bind("<KeyRelease>", schedule_symbol_index, add="+")
+    text.bind("<KeyRelease>", syntax_highlighter.schedule, add="+")
+    text.bind("<F12>", goto_definition)
+    text.bind("<Control-slash>", toggle_comment)
+    text.bind("<Control-braceleft>", toggle_fold)
+    text.bind("<<Paste>>", paste)
+    text.bind("<Control-f>", show_search_bar)
+    text.bind("<F3>", incremental_search.next_match)
+    text.bind("<Shift-F3>", incremental_search.previous_match)
+    text.bind("<KeyRelease>", on_text_edited, add="+")
+    text.bind("<KeyRelease>", update_completions, add="+")
+    text.bind("<Escape>", lambda event: paste_pipeline.cancel(), add="+")
+
+    # Bindings for toggle fullscreen and resize events
+    root.bind("<F11>", toggle_fullscreen)
+    root.bind("<Configure>", on_resize)
+    api_menu = Menu(main_menu, tearoff=0)
+    main_menu.add_cascade(label="API", menu=api_menu)
+    api_menu.add_command(label="Open API Interface", command=api_interaction)
+    # Main loop
     root.mainloop()
 
@@ -0,0 +1,62 @@
+import io
+import json
+import os
+
+from BatchMode import parse_args, output_path, process_file, run
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_process_file_keeps_line_endings_and_encoding(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("in/notes.txt", "café one\r\ntwo\r\n".encode("latin-1"))
+    options = parse_args(["--case", "upper", "--count", "--output-dir", "out", "in/notes.txt"])
+    result = process_file("in/notes.txt", options)
+    assert result["output"] == os.path.join("out", "in", "notes.txt")
+    assert result["words"] == 3
+    assert read(result["output"]) == "CAFÉ ONE\r\nTWO\r\n".encode("latin-1")
+    assert read("in/notes.txt") == "café one\r\ntwo\r\n".encode("latin-1")
+
+
+def test_process_file_reports_errors(tmp_path):
+    result = process_file(str(tmp_path / "missing.txt"), parse_args(["--count"]))
+    assert "error" in result
+
+
+def test_unchanged_file_is_not_written(tmp_path):
+    path = tmp_path / "a.txt"
+    write(str(path), b"abc\n")
+    result = process_file(str(path), parse_args(["--in-place", "--replace", "x", "y"]))
+    assert result == {"path": str(path), "replacements": 0}
+
+
+def test_output_dir_keeps_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    options = parse_args(["--output-dir", "out"])
+    assert output_path("a/notes.txt", options) != output_path("b/notes.txt", options)
+    assert output_path("a/notes.txt", options, ".html") == os.path.join("out", "a", "notes.txt.html")
+    outside = output_path(os.path.join(os.path.dirname(str(tmp_path)), "x.txt"), options)
+    assert os.path.abspath(outside).startswith(str(tmp_path / "out"))
+
+
+def test_run_refuses_inputs_with_the_same_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("a/notes.txt", b"a\n")
+    write("b/notes.txt", b"b\n")
+    out = io.StringIO()
+    options = parse_args(["--case", "upper", "--output-dir", "out", "--jobs", "1",
+                          "a/notes.txt", "b/notes.txt", "./a/notes.txt"])
+    assert run(options, out) == 1
+    results = {result["path"]: result for result in map(json.loads, out.getvalue().splitlines())}
+    assert read(results["a/notes.txt"]["output"]) == b"A\n"
+    assert read(results["b/notes.txt"]["output"]) == b"B\n"
+    assert "error" in results["./a/notes.txt"]
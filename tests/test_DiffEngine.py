@@ -0,0 +1,98 @@
+import random
+from DiffEngine import diff_lines, write_minimal
+
+
+def check_opcodes(a, b):
+    """
+    Check that the opcodes cover both sides in order and that applying them to a gives b.
+    """
+    opcodes = diff_lines(a, b)
+    i = j = 0
+    result = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        assert i1 <= i2 and j1 <= j2
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2] and i2 > i1
+        elif tag == "replace":
+            assert i2 > i1 and j2 > j1
+        elif tag == "delete":
+            assert i2 > i1 and j2 == j1
+        elif tag == "insert":
+            assert i2 == i1 and j2 > j1
+        else:
+            raise AssertionError(tag)
+        result += b[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    assert result == b
+    # Equal runs are merged, so no two in a row
+    tags = [opcode[0] for opcode in opcodes]
+    assert ("equal", "equal") not in zip(tags, tags[1:])
+    return opcodes
+
+
+def test_diff_lines_simple_cases():
+    assert diff_lines([], []) == []
+    assert diff_lines(["a\n"], ["a\n"]) == [("equal", 0, 1, 0, 1)]
+    assert diff_lines([], ["a\n"]) == [("insert", 0, 0, 0, 1)]
+    assert diff_lines(["a\n"], []) == [("delete", 0, 1, 0, 0)]
+    assert check_opcodes(["a", "b", "c"], ["a", "x", "c"]) == [
+        ("equal", 0, 1, 0, 1), ("replace", 1, 2, 1, 2), ("equal", 2, 3, 2, 3)]
+
+
+def test_diff_lines_invariants_random():
+    rng = random.Random(1234)
+    for _ in range(300):
+        a = [rng.choice("abcde") for _ in range(rng.randrange(30))]
+        b = list(a)
+        for _ in range(rng.randrange(6)):
+            position = rng.randrange(len(b) + 1)
+            if b and rng.random() < 0.5:
+                del b[min(position, len(b) - 1)]
+            else:
+                b.insert(position, rng.choice("abcdef"))
+        check_opcodes(a, b)
+        check_opcodes(a, [rng.choice("abcxyz") for _ in range(rng.randrange(30))])
+
+
+def test_diff_lines_moved_block():
+    a = [f"line {n}\n" for n in range(50)]
+    b = a[25:] + a[:25]
+    check_opcodes(a, b)
+
+
+def test_write_minimal_append(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"one\ntwo\n")
+    assert write_minimal(path, b"one\ntwo\n", b"one\ntwo\nthree\n") == "append"
+    assert path.read_bytes() == b"one\ntwo\nthree\n"
+
+
+def test_write_minimal_patch(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"one\ntwo\nsix\n")
+    assert write_minimal(path, b"one\ntwo\nsix\n", b"one\nTWO\nsix\n") == "patch"
+    assert path.read_bytes() == b"one\nTWO\nsix\n"
+
+
+def test_write_minimal_rewrite(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"one\ntwo\n")
+    # Shorter text cannot be patched in place
+    assert write_minimal(path, b"one\ntwo\n", b"one\n") == "rewrite"
+    assert path.read_bytes() == b"one\n"
+    # Nor can a file that no longer holds the old version
+    path.write_bytes(b"changed on disk\n")
+    assert write_minimal(path, b"one\n", b"one\nmore\n") == "rewrite"
+    assert path.read_bytes() == b"one\nmore\n"
+    # Without the old version the file is always rewritten
+    assert write_minimal(path, None, b"fresh\n") == "rewrite"
+    assert path.read_bytes() == b"fresh\n"
+
+
+def test_write_minimal_unchanged(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"same\n")
+    assert write_minimal(path, b"same\n", b"same\n") == "unchanged"
+    assert path.read_bytes() == b"same\n"
@@ -0,0 +1,47 @@
+import random
+
+from FoldIndex import FoldIndex, compute_regions, indent_of
+
+
+def full_regions(lines):
+    indents = [indent_of(line) for line in lines]
+    return compute_regions(indents, 0, len(indents))
+
+
+def test_regions_end_at_last_non_blank_line():
+    lines = ["def f():", "    a", "", "    if x:", "        b", "", "c"]
+    assert full_regions(lines) == [(1, 5), (4, 5)]
+
+
+def test_region_lookup():
+    index = FoldIndex()
+    index.load(["class A:", "    def f(self):", "        pass", "", "x = 1"])
+    assert index.region_at(1) == (1, 3)
+    assert index.region_at(3) == (2, 3)
+    assert index.region_at(5) is None
+    assert index.region_starting_near(0) == (1, 3)
+    assert index.top_level_regions() == [(1, 3)]
+
+
+def test_update_reports_unchanged_document():
+    index = FoldIndex()
+    index.load(["a", "    b"])
+    assert not index.update(["a", "    b"])
+    assert index.update(["a", "    b", "    c"])
+    assert index.regions == [(1, 3)]
+
+
+def test_replace_lines_matches_full_index():
+    rng = random.Random(1)
+    pieces = ["def f():", "    x", "        y", "\ty", "", "  ", "z", "class C:"]
+    lines = [rng.choice(pieces) for _ in range(60)]
+    index = FoldIndex()
+    index.load(lines)
+    for _ in range(500):
+        start = rng.randrange(len(lines) + 1)
+        old_count = rng.randrange(min(4, len(lines) - start) + 1)
+        new_lines = [rng.choice(pieces) for _ in range(rng.randrange(4))]
+        lines[start:start + old_count] = new_lines
+        index.replace_lines(start, old_count, new_lines)
+        assert index.lines == lines
+        assert index.regions == full_regions(lines)
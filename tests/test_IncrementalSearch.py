@@ -0,0 +1,51 @@
+import random
+import re
+
+import pytest
+
+import IncrementalSearch
+from IncrementalSearch import find_matches, match_reach, SearchCancelled
+
+
+def spans(result):
+    starts, ends = result
+    return list(zip(starts, ends))
+
+
+def test_plain_search_in_any_case():
+    code = "Foo foo FOO"
+    assert spans(find_matches(code, "foo")) == [(0, 3), (4, 7), (8, 11)]
+    assert spans(find_matches(code, "foo", folded=code.lower())) == [(0, 3), (4, 7), (8, 11)]
+    assert spans(find_matches(code, "foo", match_case=True)) == [(4, 7)]
+    assert spans(find_matches(code, "")) == []
+
+
+def test_regex_skips_empty_matches():
+    assert spans(find_matches("a1 b22", r"\d*", regex=True)) == [(1, 2), (4, 6)]
+
+
+def test_match_reach():
+    assert match_reach(re.compile(r"ab|c{2,5}")) == 5
+    assert match_reach(re.compile(r"\w+")) is None
+    assert match_reach(re.compile(r"a(?=b)")) is None
+
+
+def test_windows_find_what_the_whole_text_has(monkeypatch):
+    monkeypatch.setattr(IncrementalSearch, "WINDOW", 64)
+    rng = random.Random(3)
+    queries = ["ab", "b a", r"\bab\b", r"a$", r"a\nb", r"(a|b b)\1", r"^a", r"(?<=b)a", r"\w+", r"a(?=b)"]
+    for _ in range(500):
+        code = "".join(rng.choice("ab \n") for _ in range(rng.randrange(400)))
+        query = rng.choice(queries)
+        regex = query != re.escape(query)
+        pattern = re.compile(query if regex else re.escape(query), re.IGNORECASE)
+        expected = [match.span() for match in pattern.finditer(code) if match.end() > match.start()]
+        assert spans(find_matches(code, query, regex=regex)) == expected
+
+
+def test_cancelled_between_windows(monkeypatch):
+    monkeypatch.setattr(IncrementalSearch, "WINDOW", 64)
+    checks = []
+    with pytest.raises(SearchCancelled):
+        find_matches("x" * 1000, "y", is_current=lambda: not checks.append(1) and len(checks) < 3)
+    assert len(checks) == 3
@@ -0,0 +1,36 @@
+from MultiCursor import edit_lines, move_carets
+
+
+def test_insert_at_every_caret():
+    lines = ["abc", "def", "ghi"]
+    new_lines, selections = edit_lines(lines, 1, [(1, 1, 1), (1, 3, 3), (3, 0, 0)], "insert", "X")
+    assert new_lines == ["aXbcX", "def", "Xghi"]
+    assert selections == [(1, 2, 2), (1, 5, 5), (3, 1, 1)]
+
+
+def test_column_selection_is_replaced():
+    lines = ["abcdef", "ab", "abcdef"]
+    # A block from column 1 to 4; the short line is clipped to its end
+    new_lines, selections = edit_lines(lines, 10, [(10, 1, 4), (11, 1, 4), (12, 1, 4)], "insert", "-")
+    assert new_lines == ["a-ef", "a-", "a-ef"]
+    assert selections == [(10, 2, 2), (11, 2, 2), (12, 2, 2)]
+
+
+def test_backspace_and_delete():
+    lines = ["abc", "abc"]
+    assert edit_lines(lines, 1, [(1, 0, 0), (2, 2, 2)], "BackSpace") == (["abc", "ac"], [(1, 0, 0), (2, 1, 1)])
+    assert edit_lines(lines, 1, [(1, 3, 3), (2, 0, 0)], "Delete") == (["abc", "bc"], [(1, 3, 3), (2, 0, 0)])
+
+
+def test_overlapping_carets_on_one_line_merge():
+    new_lines, selections = edit_lines(["abcd"], 1, [(1, 1, 3), (1, 2, 2)], "insert", "x")
+    assert new_lines == ["axd"]
+    assert selections == [(1, 2, 2)]
+
+
+def test_move_carets_collapses_and_clamps():
+    lines = ["ab", ""]
+    assert move_carets(lines, 1, [(1, 0, 0), (2, 0, 0)], "Left") == [(1, 0, 0), (2, 0, 0)]
+    assert move_carets(lines, 1, [(1, 0, 2)], "Left") == [(1, 0, 0)]
+    assert move_carets(lines, 1, [(1, 0, 1), (1, 1, 1)], "Right") == [(1, 1, 1), (1, 2, 2)]
+    assert move_carets(lines, 1, [(1, 1, 1), (2, 0, 0)], "End") == [(1, 2, 2), (2, 0, 0)]
@@ -0,0 +1,40 @@
+from SelectionTransform import (indent_edits, unindent_edits, comment_edits, numbered_list_edits,
+                                bulleted_list_edits, apply_line_edits)
+
+
+def transform(lines, make_edits, first_line=1):
+    return apply_line_edits(lines, first_line, make_edits(lines, first_line))
+
+
+def test_indent_skips_blank_lines():
+    assert transform(["a", "", "  b"], indent_edits) == ["    a", "", "      b"]
+
+
+def test_unindent_removes_one_level():
+    assert transform(["\tx", "      y", "  z", "w"], unindent_edits) == ["x", "  y", "z", "w"]
+
+
+def test_comment_toggles_at_common_indentation():
+    commented = transform(["    a", "", "        b"], comment_edits)
+    assert commented == ["    # a", "", "    #     b"]
+    assert transform(commented, comment_edits) == ["    a", "", "        b"]
+    assert transform(["#a", "# b"], comment_edits) == ["a", "b"]
+    assert comment_edits(["", "  "], 1) == []
+
+
+def test_numbered_list_renumbers():
+    assert transform(["3. a", "b", "1. c"], numbered_list_edits) == ["1. a", "2. b", "3. c"]
+
+
+def test_bulleted_list_skips_existing_bullets():
+    assert transform(["- a", "b"], bulleted_list_edits) == ["- a", "- b"]
+
+
+def test_edits_use_document_line_numbers():
+    edits = indent_edits(["a", "b"], 41)
+    assert [edit[0] for edit in edits] == [41, 42]
+    assert apply_line_edits(["a", "b"], 41, edits) == ["    a", "    b"]
+
+
+def test_several_edits_on_one_line_apply_right_to_left():
+    assert apply_line_edits(["abcdef"], 1, [(1, 0, 1, "X"), (1, 4, 6, "")]) == ["Xbcd"]
@@ -0,0 +1,32 @@
+from TextTools import decode_text, newline_style, extract_keywords, replace_text, change_case, make_list
+
+
+def test_decode_text_falls_back_to_latin1():
+    assert decode_text("café\r\n".encode("utf-8")) == ("café\n", "utf-8")
+    assert decode_text("café".encode("latin-1")) == ("café", "latin-1")
+
+
+def test_newline_style_follows_most_lines():
+    assert newline_style(b"a\r\nb\r\nc\n") == "\r\n"
+    assert newline_style(b"a\nb\nc\r\n") == "\n"
+    assert newline_style(b"no newline") == "\n"
+
+
+def test_extract_keywords_ignores_case_and_punctuation():
+    assert extract_keywords("Cat, cat! dog. Cat dog bird", 2) == ["cat", "dog"]
+
+
+def test_replace_text_plain_and_regex():
+    assert replace_text("a.b A.B", "a.b", "x\\1") == ("x\\1 A.B", 1)
+    assert replace_text("a.b A.B", "a.b", "x", match_case=False) == ("x x", 2)
+    assert replace_text("a1 b22", r"(\w)(\d+)", r"\2\1", regex=True) == ("1a 22b", 2)
+
+
+def test_change_case():
+    assert change_case("hello world", "title") == "Hello World"
+    assert change_case("Hello", "upper") == "HELLO"
+
+
+def test_make_list_keeps_final_newline():
+    assert make_list("a\nb\n", "numbered") == "1. a\n2. b\n"
+    assert make_list("- a\nb", "bulleted") == "- a\n- b"
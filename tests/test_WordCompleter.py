@@ -0,0 +1,55 @@
+import random
+from collections import Counter
+
+from WordCompleter import PrefixTrie, WordCompleter
+
+
+def ranked(counts, prefix, k):
+    words = [(count, word) for word, count in counts.items() if count > 0 and word.startswith(prefix)]
+    return [word for _, word in sorted(words, key=lambda entry: (-entry[0], entry[1]))[:k]]
+
+
+def test_most_frequent_first():
+    trie = PrefixTrie()
+    for word, count in [("apple", 3), ("apply", 5), ("ape", 1), ("banana", 9)]:
+        trie.add(word, count)
+    assert trie.complete("ap") == ["apply", "apple", "ape"]
+    assert trie.complete("b") == ["banana"]
+    assert trie.complete("c") == []
+
+
+def test_ranking_after_removals():
+    trie = PrefixTrie()
+    trie.add("apply", 5)
+    trie.add("apple", 3)
+    assert trie.complete("ap", 1) == ["apply"]
+    trie.add("apply", -4)
+    assert trie.complete("ap") == ["apple", "apply"]
+    trie.add("apply", -1)
+    assert trie.complete("ap") == ["apple"]
+    assert "y" not in trie._node("appl").children  # Emptied words are pruned
+
+
+def test_cached_ranking_matches_counts():
+    rng = random.Random(7)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randrange(1, 5))) for _ in range(40)]
+    trie = PrefixTrie()
+    counts = Counter()
+    for _ in range(2000):
+        word = rng.choice(words)
+        delta = rng.choice([1, 2, -1, -3])
+        trie.add(word, delta)
+        counts[word] = max(0, counts[word] + delta)
+        prefix = rng.choice(words)[:rng.randrange(3)]
+        assert trie.complete(prefix, 10) == ranked(counts, prefix, 10)
+
+
+def test_completer_follows_edits():
+    completer = WordCompleter()
+    completer.start("hello help\nworld")
+    while completer.loading():
+        pass
+    assert completer.complete("hel") == ["hello", "help"]
+    completer.edited(1, "hello help", "helm")
+    assert completer.complete("hel") == ["helm"]
+    assert completer.complete("He") == ["Helm"]